@@ -11,11 +11,10 @@ project_root = os.path.dirname(os.path.dirname(__file__))  # one level up
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-# Now these imports work:
-from database import Base
-from config import config as app_config  # global Config instance
-
-DATABASE_URL = app_config.DATABASE_URL
+# Now these imports work. Only the lightweight database module is needed here:
+# it loads .env and resolves DATABASE_URL itself, whereas importing the app-wide
+# config would also pull in the OpenAI client on every alembic invocation.
+from database import Base, DATABASE_URL
 # ----------------------------------------------------
 
 # Alembic Config object (reads alembic.ini)
@@ -52,10 +51,15 @@ def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = DATABASE_URL
 
+    # One persistent connection for the whole run, so backfills and reflection that
+    # check out connections don't pay a fresh connect/TLS handshake each time.
     connectable = engine_from_config(
         configuration,
         prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
+        poolclass=pool.QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_pre_ping=True,
     )
 
     with connectable.connect() as connection:
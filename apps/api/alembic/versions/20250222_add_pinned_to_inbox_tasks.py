@@ -12,12 +12,12 @@ depends_on = None
 
 
 def upgrade():
+    # A constant server default lets Postgres 11+ add the NOT NULL column as a
+    # catalog-only change instead of rewriting every row.
     op.add_column(
         "inbox_tasks",
-        sa.Column("pinned", sa.Boolean(), nullable=True),
+        sa.Column("pinned", sa.Boolean(), nullable=False, server_default=sa.false()),
     )
-    op.execute("UPDATE inbox_tasks SET pinned = false WHERE pinned IS NULL")
-    op.alter_column("inbox_tasks", "pinned", nullable=False)
 
 
 def downgrade():
@@ -12,8 +12,14 @@ down_revision = "20250222_pin_inbox_tasks"
 branch_labels = None
 depends_on = None
 
+# Rows per executemany() call on the client-side backfill path
+BACKFILL_BATCH_SIZE = 5000
+
 
 def upgrade():
+    conn = op.get_bind()
+    is_pg = conn.dialect.name == "postgresql"
+
     op.create_table(
         "chat_instances",
         sa.Column("id", sa.String(), primary_key=True),
@@ -25,54 +31,139 @@ def upgrade():
     )
     op.create_index("ix_chat_instances_room_id", "chat_instances", ["room_id"])
 
+    # The FK on messages.chat_instance_id is added after the backfill so the UPDATE
+    # doesn't pay a referential check per row.
     op.add_column("messages", sa.Column("chat_instance_id", sa.String(), nullable=True))
-    op.create_index("ix_messages_chat_instance_id", "messages", ["chat_instance_id"])
-    op.create_foreign_key(
-        "fk_messages_chat_instance",
-        source_table="messages",
-        referent_table="chat_instances",
-        local_cols=["chat_instance_id"],
-        remote_cols=["id"],
-    )
-
-    conn = op.get_bind()
-    rooms = conn.execute(sa.text("SELECT id, created_at FROM rooms")).fetchall()
-    for room_id, room_created_at in rooms:
-        chat_id = str(uuid.uuid4())
-        created_at = room_created_at or datetime.now(timezone.utc)
-        last_message_at = conn.execute(
-            sa.text("SELECT MAX(created_at) FROM messages WHERE room_id = :room_id"),
-            {"room_id": room_id},
-        ).scalar()
 
+    # Set-based backfill: one "General" chat per room, then point every message
+    # at its room's chat. Two statements regardless of how many rooms exist.
+    if is_pg:
+        # INSERT ... SELECT builds the rows inside Postgres, so nothing crosses the
+        # wire; a client-side COPY would only add a round-trip of every room.
+        # gen_random_uuid() is built in from PG13 and provided by pgcrypto before that.
+        op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
         conn.execute(
             sa.text(
                 """
                 INSERT INTO chat_instances (id, room_id, name, created_by_user_id, created_at, last_message_at)
-                VALUES (:id, :room_id, :name, NULL, :created_at, :last_message_at)
+                SELECT gen_random_uuid()::text,
+                       r.id,
+                       'General',
+                       NULL,
+                       COALESCE(r.created_at, now()),
+                       last.last_message_at
+                FROM rooms r
+                LEFT JOIN (
+                    SELECT room_id, MAX(created_at) AS last_message_at
+                    FROM messages
+                    GROUP BY room_id
+                ) last ON last.room_id = r.id
+                """
+            )
+        )
+        conn.execute(
+            sa.text(
+                """
+                UPDATE messages m
+                SET chat_instance_id = ci.id
+                FROM chat_instances ci
+                WHERE ci.room_id = m.room_id
                 """
-            ),
+            )
+        )
+    else:
+        # SQLite has no gen_random_uuid(); generate ids client-side and insert via
+        # batched executemany. One aggregation pass over messages replaces the
+        # per-room MAX() lookup.
+        last_by_room = dict(
+            conn.execute(
+                sa.text("SELECT room_id, MAX(created_at) FROM messages GROUP BY room_id")
+            ).fetchall()
+        )
+        rooms = conn.execute(sa.text("SELECT id, created_at FROM rooms")).fetchall()
+        now = datetime.now(timezone.utc)
+        rows = [
             {
-                "id": chat_id,
+                "id": str(uuid.uuid4()),
                 "room_id": room_id,
                 "name": "General",
-                "created_at": created_at,
-                "last_message_at": last_message_at,
-            },
+                "created_at": room_created_at or now,
+                "last_message_at": last_by_room.get(room_id),
+            }
+            for room_id, room_created_at in rooms
+        ]
+        insert_chat = sa.text(
+            """
+            INSERT INTO chat_instances (id, room_id, name, created_by_user_id, created_at, last_message_at)
+            VALUES (:id, :room_id, :name, NULL, :created_at, :last_message_at)
+            """
         )
-
+        for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+            conn.execute(insert_chat, rows[start:start + BACKFILL_BATCH_SIZE])
         conn.execute(
             sa.text(
                 """
                 UPDATE messages
-                SET chat_instance_id = :chat_id
-                WHERE room_id = :room_id
+                SET chat_instance_id = (
+                    SELECT ci.id FROM chat_instances ci WHERE ci.room_id = messages.room_id
+                )
                 """
-            ),
-            {"chat_id": chat_id, "room_id": room_id},
+            )
+        )
+
+    if not is_pg:
+        op.alter_column("messages", "chat_instance_id", nullable=False)
+        op.create_foreign_key(
+            "fk_messages_chat_instance",
+            source_table="messages",
+            referent_table="chat_instances",
+            local_cols=["chat_instance_id"],
+            remote_cols=["id"],
         )
 
-    op.alter_column("messages", "chat_instance_id", nullable=False)
+    with op.get_context().autocommit_block():
+        if is_pg:
+            # Prove NOT NULL with a validated CHECK first: VALIDATE only takes a
+            # SHARE UPDATE EXCLUSIVE lock, and SET NOT NULL (PG12+) then reuses the
+            # check instead of scanning messages under ACCESS EXCLUSIVE.
+            op.execute(
+                "ALTER TABLE messages ADD CONSTRAINT messages_chat_instance_id_not_null "
+                "CHECK (chat_instance_id IS NOT NULL) NOT VALID"
+            )
+            op.execute("ALTER TABLE messages VALIDATE CONSTRAINT messages_chat_instance_id_not_null")
+            op.alter_column("messages", "chat_instance_id", nullable=False)
+            op.drop_constraint("messages_chat_instance_id_not_null", "messages", type_="check")
+
+            # Same idea for the FK: add it NOT VALID, then validate existing rows
+            # without blocking writes.
+            op.create_foreign_key(
+                "fk_messages_chat_instance",
+                source_table="messages",
+                referent_table="chat_instances",
+                local_cols=["chat_instance_id"],
+                remote_cols=["id"],
+                postgresql_not_valid=True,
+            )
+            op.execute("ALTER TABLE messages VALIDATE CONSTRAINT fk_messages_chat_instance")
+
+        # Build the messages index after the backfill, without blocking writes on Postgres
+        op.create_index(
+            "ix_messages_chat_instance_id",
+            "messages",
+            ["chat_instance_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        # Serves room timelines (a room's messages newest first). Built after the
+        # backfill so the UPDATE of every message doesn't also maintain it; the
+        # backfill's GROUP BY over all rooms reads every row either way.
+        op.create_index(
+            "ix_messages_room_created_at_desc",
+            "messages",
+            ["room_id", sa.text("created_at DESC")],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
 
 
 def downgrade():
@@ -82,3 +173,5 @@ def downgrade():
 
     op.drop_index("ix_chat_instances_room_id", table_name="chat_instances")
     op.drop_table("chat_instances")
+
+    op.drop_index("ix_messages_room_created_at_desc", table_name="messages")
@@ -9,12 +9,53 @@ down_revision = "20250306_add_chat_instances"
 branch_labels = None
 depends_on = None
 
+# Rows updated per transaction during the Postgres backfill
+BACKFILL_BATCH_SIZE = 10000
 
-def upgrade():
-    op.add_column("messages", sa.Column("user_id", sa.String(), nullable=True))
-    op.create_index("ix_messages_user_id", "messages", ["user_id"])
+# Backfill user messages: sender_id like 'user:<id>'
+_USER_BACKFILL_BATCH = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM messages
+        WHERE user_id IS NULL AND sender_id LIKE 'user:%'
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE messages m
+    SET user_id = SUBSTRING(m.sender_id FROM 6)
+    FROM batch
+    WHERE m.id = batch.id
+    """
+)
 
-    conn = op.get_bind()
+# Backfill assistant messages: join agents to find owner. Agents without an owner
+# are excluded so their messages never re-qualify for the next batch.
+_AGENT_BACKFILL_BATCH = sa.text(
+    """
+    WITH batch AS (
+        SELECT m.id, a.user_id
+        FROM messages m
+        JOIN agents a ON REPLACE(m.sender_id, 'agent:', '') = a.id
+        WHERE m.user_id IS NULL
+          AND m.sender_id LIKE 'agent:%'
+          AND a.user_id IS NOT NULL
+        LIMIT :batch_size
+        FOR UPDATE OF m SKIP LOCKED
+    )
+    UPDATE messages m
+    SET user_id = batch.user_id
+    FROM batch
+    WHERE m.id = batch.id
+    """
+)
+
+
+def _backfill_in_batches(conn, statement) -> None:
+    while conn.execute(statement, {"batch_size": BACKFILL_BATCH_SIZE}).rowcount:
+        pass
+
+
+def _backfill_all(conn) -> None:
     # Backfill user messages: sender_id like 'user:<id>'
     conn.execute(
         sa.text(
@@ -40,6 +81,39 @@ def upgrade():
     )
 
 
+def upgrade():
+    op.add_column("messages", sa.Column("user_id", sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        _backfill_all(conn)
+        op.create_index("ix_messages_user_id", "messages", ["user_id"])
+        return
+
+    # Backfill in short transactions so row locks are held per batch rather than
+    # across the whole messages table.
+    with op.get_context().autocommit_block():
+        # Temporary partial index so each user batch is an index scan over the
+        # rows still pending instead of a seq scan of messages.
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_sender_user_backfill
+            ON messages (id)
+            WHERE user_id IS NULL AND sender_id LIKE 'user:%'
+            """
+        )
+        _backfill_in_batches(conn, _USER_BACKFILL_BATCH)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_sender_user_backfill")
+        _backfill_in_batches(conn, _AGENT_BACKFILL_BATCH)
+        op.create_index(
+            "ix_messages_user_id",
+            "messages",
+            ["user_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
 def downgrade():
     op.drop_index("ix_messages_user_id", table_name="messages")
     op.drop_column("messages", "user_id")
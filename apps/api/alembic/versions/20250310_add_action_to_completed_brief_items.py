@@ -24,8 +24,6 @@ def upgrade():
     op.add_column("completed_brief_items", sa.Column("timeframe", sa.Text(), nullable=True))
     op.add_column("completed_brief_items", sa.Column("section", sa.Text(), nullable=True))
     op.add_column("completed_brief_items", sa.Column("raw_item", postgresql.JSONB(), nullable=True))
-    # Backfill action for existing rows
-    op.execute("UPDATE completed_brief_items SET action = 'completed' WHERE action IS NULL")
 
 
 def downgrade():
@@ -5,6 +5,7 @@ Revises: 20250310_add_action_to_completed_brief_items
 Create Date: 2025-03-12
 """
 
+import logging
 import os
 from typing import Sequence, Union
 
@@ -13,44 +14,111 @@ import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 from pgvector.sqlalchemy import Vector
 
+from migration_helpers import INDEX_MAINTENANCE_WORK_MEM, IVFFLAT_MIN_TRAINING_ROWS, ivfflat_lists
+
 # revision identifiers, used by Alembic.
 revision: str = "20250312_rag_pgvector_upgrade"
 down_revision: Union[str, Sequence[str], None] = "20250310_add_action_to_completed_brief_items"
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+logger = logging.getLogger("alembic.runtime.migration")
 
-def _is_postgres(bind) -> bool:
-    return bind.dialect.name == "postgresql"
+# Rows per round-trip when embeddings have to be converted client-side
+EMBEDDING_BATCH_SIZE = 1000
 
+# Legacy JSON embeddings that can be cast to vector(1536): arrays of exactly 1536 numbers
+_EMBEDDING_FILTER = """
+    embedding IS NOT NULL
+    AND jsonb_typeof(CAST(embedding AS jsonb)) = 'array'
+    AND jsonb_array_length(CAST(embedding AS jsonb)) = 1536
+    AND NOT EXISTS (
+        SELECT 1
+        FROM jsonb_array_elements(CAST(embedding AS jsonb)) AS elem
+        WHERE jsonb_typeof(elem) <> 'number'
+    )
+"""
 
-def _migrate_memory_embeddings(bind) -> None:
-    """Copy existing JSON embeddings into the new vector column when possible."""
-    result = bind.execute(sa.text("SELECT id, embedding FROM memories WHERE embedding IS NOT NULL"))
-    rows = result.fetchall()
 
-    for row in rows:
-        emb = row.embedding
-        if not isinstance(emb, (list, tuple)):
-            continue
-        if len(emb) != 1536:
-            continue
+def _embedded_memory_count(bind) -> int:
+    return bind.execute(sa.text("SELECT count(*) FROM memories WHERE embedding IS NOT NULL")).scalar() or 0
+
+
+def _update_embedding_batch(bind, batch: list[tuple[str, str]]) -> None:
+    """Write one batch of ``(id, vector_literal)`` pairs with a single UPDATE ... FROM (VALUES ...)."""
+    params = {}
+    values = []
+    for i, (memory_id, vector_literal) in enumerate(batch):
+        params[f"id_{i}"] = memory_id
+        params[f"vec_{i}"] = vector_literal
+        values.append(f"(:id_{i}, :vec_{i})")
+    bind.execute(
+        sa.text(
+            "UPDATE memories SET embedding_vec = CAST(data.vec AS vector) "
+            f"FROM (VALUES {', '.join(values)}) AS data(id, vec) "
+            "WHERE memories.id = data.id"
+        ),
+        params,
+    )
+
+
+def _flush_embedding_batch(bind, batch: list[tuple[str, str]]) -> None:
+    if not batch:
+        return
+    try:
+        with bind.begin_nested():
+            _update_embedding_batch(bind, batch)
+        return
+    except sa.exc.DBAPIError:
+        pass
+    # Best effort: retry row by row so one bad embedding doesn't drop the whole batch
+    for row in batch:
         try:
-            vector_literal = "[" + ",".join(str(float(x)) for x in emb) + "]"
+            with bind.begin_nested():
+                _update_embedding_batch(bind, [row])
+        except sa.exc.DBAPIError:
+            continue
+
+
+def _migrate_memory_embeddings_in_batches(bind) -> None:
+    """Stream embeddings through a server-side cursor and write them back in batches.
+
+    Postgres renders each JSON array as text that is already a valid vector literal,
+    so Python never decodes or re-formats the 1536 floats per row.
+    """
+    result = bind.execution_options(stream_results=True, yield_per=EMBEDDING_BATCH_SIZE).execute(
+        sa.text(f"SELECT id, CAST(embedding AS jsonb)::text AS vec FROM memories WHERE {_EMBEDDING_FILTER}")
+    )
+    for rows in result.partitions():
+        _flush_embedding_batch(bind, [(row.id, row.vec) for row in rows])
+
+
+def _migrate_memory_embeddings(bind) -> None:
+    """Copy existing JSON embeddings into the new vector column when possible.
+
+    The conversion normally runs as a single set-based UPDATE: the JSON array text
+    is cast straight to ``vector`` inside Postgres. Rows that are not a 1536-element
+    array of numbers are skipped, matching the previous best-effort behaviour. If
+    that statement fails (e.g. a value outside float4 range), fall back to streaming
+    the rows and converting them in batches so only the bad rows are skipped.
+    """
+    try:
+        with bind.begin_nested():
             bind.execute(
                 sa.text(
-                    "UPDATE memories SET embedding_vec = CAST(:vec AS vector) WHERE id = :id"
-                ),
-                {"vec": vector_literal, "id": row.id},
+                    "UPDATE memories SET embedding_vec = CAST(CAST(embedding AS jsonb)::text AS vector) "
+                    f"WHERE {_EMBEDDING_FILTER}"
+                )
             )
-        except Exception:
-            # Best effort; continue on failures
-            continue
+        return
+    except sa.exc.DBAPIError:
+        pass
+    _migrate_memory_embeddings_in_batches(bind)
 
 
 def upgrade() -> None:
     bind = op.get_bind()
-    is_pg = _is_postgres(bind)
+    is_pg = bind.dialect.name == "postgresql"
 
     # Core tables/columns that should exist on all backends
     op.create_table(
@@ -67,15 +135,11 @@ def upgrade() -> None:
         sa.UniqueConstraint("entity_type", "entity_id", name="uq_embedding_job_entity"),
     )
 
-    op.add_column(
-        "rooms",
-        sa.Column(
-            "summaries_updated_at",
-            sa.DateTime(timezone=True),
-            server_default=sa.text("now()") if is_pg else None,
-            nullable=True,
-        ),
-    )
+    # Add without a default, then attach it: existing rooms keep NULL and the
+    # column add stays a catalog-only change.
+    op.add_column("rooms", sa.Column("summaries_updated_at", sa.DateTime(timezone=True), nullable=True))
+    if is_pg:
+        op.alter_column("rooms", "summaries_updated_at", server_default=sa.text("now()"))
     op.add_column("daily_briefs", sa.Column("room_id", sa.String(), nullable=True))
     op.add_column("daily_briefs", sa.Column("summary_text", sa.Text(), nullable=True))
 
@@ -106,27 +170,66 @@ def upgrade() -> None:
     op.drop_column("memories", "embedding")
     op.alter_column("memories", "embedding_vec", new_column_name="embedding")
 
-    op.create_index("ix_memories_room_created", "memories", ["room_id", "created_at"], unique=False)
-    op.create_index("ix_memories_user_created", "memories", ["user_id", "created_at"], unique=False)
+    # memories can be large; build its btree indexes without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_memories_room_created",
+            "memories",
+            ["room_id", "created_at"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_memories_user_created",
+            "memories",
+            ["user_id", "created_at"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
 
-    index_type = os.getenv("VECTOR_INDEX_TYPE", "ivfflat").lower()
+    index_type = os.getenv("VECTOR_INDEX_TYPE", "hnsw").lower()
     if index_type not in {"ivfflat", "hnsw"}:
-        index_type = "ivfflat"
+        index_type = "hnsw"
+    embedded_rows = _embedded_memory_count(bind) if index_type == "ivfflat" else 0
+    if index_type == "ivfflat" and embedded_rows < IVFFLAT_MIN_TRAINING_ROWS:
+        # HNSW needs no training pass, so it is the safe choice for a fresh or small table
+        logger.warning(
+            "Only %d memory embeddings to train ivfflat on (need %d); building HNSW instead",
+            embedded_rows,
+            IVFFLAT_MIN_TRAINING_ROWS,
+        )
+        index_type = "hnsw"
+
+    # Vector index builds are memory- and CPU-bound; raise the budget and allow a
+    # parallel build (pgvector 0.6+ for HNSW) for this transaction only.
+    try:
+        parallel_workers = max(0, int(os.getenv("VECTOR_INDEX_PARALLEL_WORKERS", "8")))
+    except ValueError:
+        logger.warning("Ignoring non-integer VECTOR_INDEX_PARALLEL_WORKERS; using 8")
+        parallel_workers = 8
+    for name, value in (
+        ("maintenance_work_mem", INDEX_MAINTENANCE_WORK_MEM),
+        ("max_parallel_maintenance_workers", str(parallel_workers)),
+        ("max_parallel_workers", str(parallel_workers * 2)),
+    ):
+        bind.execute(sa.text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
 
     if index_type == "hnsw":
         op.execute(
             """
             CREATE INDEX IF NOT EXISTS memories_embedding_idx
             ON memories
-            USING hnsw (embedding vector_cosine_ops)
+            USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)
             """
         )
     else:
         op.execute(
-            """
+            f"""
             CREATE INDEX IF NOT EXISTS memories_embedding_idx
             ON memories
-            USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)
+            USING ivfflat (embedding vector_cosine_ops) WITH (lists = {ivfflat_lists(embedded_rows)})
             """
         )
 
@@ -138,18 +241,13 @@ def upgrade() -> None:
         """
     )
 
-    op.execute(
-        """
-        CREATE INDEX IF NOT EXISTS messages_content_trgm_idx
-        ON messages
-        USING gin (content gin_trgm_ops)
-        """
-    )
+    # messages_content_trgm_idx is built in 20250315 once messages.deleted_at exists,
+    # so it can skip soft-deleted rows.
 
 
 def downgrade() -> None:
     bind = op.get_bind()
-    is_pg = _is_postgres(bind)
+    is_pg = bind.dialect.name == "postgresql"
 
     if is_pg:
         op.execute("DROP INDEX IF EXISTS messages_content_trgm_idx")
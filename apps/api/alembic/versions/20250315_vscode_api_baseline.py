@@ -18,13 +18,9 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
-def _is_pg(bind) -> bool:
-    return bind.dialect.name == "postgresql"
-
-
 def upgrade() -> None:
     bind = op.get_bind()
-    is_pg = _is_pg(bind)
+    is_pg = bind.dialect.name == "postgresql"
     json_type = postgresql.JSONB() if is_pg else sa.JSON()
 
     # Personal access tokens
@@ -45,28 +41,17 @@ def upgrade() -> None:
         sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
     )
 
-    # Chat/message soft-delete + metadata
-    op.add_column(
-        "chat_instances",
-        sa.Column(
-            "updated_at",
-            sa.DateTime(timezone=True),
-            server_default=sa.text("now()") if is_pg else None,
-            nullable=True,
-        ),
-    )
+    # Chat/message soft-delete + metadata. updated_at is added without a default and
+    # the default attached afterwards, so existing rows keep NULL and neither table
+    # is rewritten.
+    op.add_column("chat_instances", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
     op.add_column("chat_instances", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
 
-    op.add_column(
-        "messages",
-        sa.Column(
-            "updated_at",
-            sa.DateTime(timezone=True),
-            server_default=sa.text("now()") if is_pg else None,
-            nullable=True,
-        ),
-    )
+    op.add_column("messages", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
     op.add_column("messages", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    if is_pg:
+        op.alter_column("chat_instances", "updated_at", server_default=sa.text("now()"))
+        op.alter_column("messages", "updated_at", server_default=sa.text("now()"))
     op.add_column("messages", sa.Column("metadata_json", json_type, nullable=True))
 
     # Task enhancements
@@ -75,7 +60,6 @@ def upgrade() -> None:
     op.add_column("tasks", sa.Column("priority", sa.String(), nullable=True))
     op.add_column("tasks", sa.Column("tags", json_type, nullable=True))
     op.add_column("tasks", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
-    op.create_index("ix_tasks_workspace", "tasks", ["workspace_id"])
 
     # Workspace events table for SSE/WS
     op.create_table(
@@ -94,8 +78,31 @@ def upgrade() -> None:
         ),
     )
 
+    # tasks already holds data; build its index without blocking writes on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_workspace",
+            "tasks",
+            ["workspace_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        if is_pg:
+            # Trigram search only ever targets live messages; leaving soft-deleted and
+            # empty rows out keeps the GIN index smaller and faster to build.
+            op.execute(
+                """
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS messages_content_trgm_idx
+                ON messages
+                USING gin (content gin_trgm_ops)
+                WHERE deleted_at IS NULL AND content IS NOT NULL
+                """
+            )
+
 
 def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS messages_content_trgm_idx")
     op.drop_table("workspace_events")
     op.drop_index("ix_tasks_workspace", table_name="tasks")
     op.drop_column("tasks", "deleted_at")
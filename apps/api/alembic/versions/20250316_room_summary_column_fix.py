@@ -18,6 +18,7 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def _get_columns(bind) -> set[str]:
+    """Read the rooms columns once; callers track their own changes afterwards."""
     insp = sa.inspect(bind)
     return {col["name"] for col in insp.get_columns("rooms")}
 
@@ -35,14 +36,14 @@ def upgrade() -> None:
                 new_column_name="summary_updated_at",
                 existing_type=sa.DateTime(timezone=True),
             )
+        cols = (cols - {"summaries_updated_at"}) | {"summary_updated_at"}
     elif "summary_updated_at" not in cols:
-        op.add_column(
-            "rooms",
-            sa.Column("summary_updated_at", sa.DateTime(timezone=True), server_default=default, nullable=True),
-        )
+        op.add_column("rooms", sa.Column("summary_updated_at", sa.DateTime(timezone=True), nullable=True))
+        if default is not None:
+            op.alter_column("rooms", "summary_updated_at", server_default=default)
+        cols = cols | {"summary_updated_at"}
 
     # Drop the stray column if both exist
-    cols = _get_columns(bind)
     if "summaries_updated_at" in cols and "summary_updated_at" in cols:
         with op.batch_alter_table("rooms") as batch:
             batch.drop_column("summaries_updated_at")
@@ -61,13 +62,13 @@ def downgrade() -> None:
                 new_column_name="summaries_updated_at",
                 existing_type=sa.DateTime(timezone=True),
             )
+        cols = (cols - {"summary_updated_at"}) | {"summaries_updated_at"}
     elif "summaries_updated_at" not in cols:
-        op.add_column(
-            "rooms",
-            sa.Column("summaries_updated_at", sa.DateTime(timezone=True), server_default=default, nullable=True),
-        )
+        op.add_column("rooms", sa.Column("summaries_updated_at", sa.DateTime(timezone=True), nullable=True))
+        if default is not None:
+            op.alter_column("rooms", "summaries_updated_at", server_default=default)
+        cols = cols | {"summaries_updated_at"}
 
-    cols = _get_columns(bind)
     if "summary_updated_at" in cols and "summaries_updated_at" in cols:
         with op.batch_alter_table("rooms") as batch:
             batch.drop_column("summary_updated_at")
@@ -3,6 +3,8 @@
 from alembic import op
 import sqlalchemy as sa
 
+from migration_helpers import has_column
+
 
 # revision identifiers, used by Alembic.
 revision = "20250323_add_joined_at_room_members"
@@ -21,7 +23,7 @@ def upgrade():
         )
     else:
         with op.batch_alter_table("room_members") as batch_op:
-            if not _has_column(bind, "room_members", "joined_at"):
+            if not has_column(sa.inspect(bind), "room_members", "joined_at"):
                 batch_op.add_column(
                     sa.Column(
                         "joined_at",
@@ -39,11 +41,5 @@ def downgrade():
         op.execute("ALTER TABLE room_members DROP COLUMN IF EXISTS joined_at")
     else:
         with op.batch_alter_table("room_members") as batch_op:
-            if _has_column(bind, "room_members", "joined_at"):
+            if has_column(sa.inspect(bind), "room_members", "joined_at"):
                 batch_op.drop_column("joined_at")
-
-
-def _has_column(bind, table_name: str, column_name: str) -> bool:
-    inspector = sa.inspect(bind)
-    cols = [col["name"] for col in inspector.get_columns(table_name)]
-    return column_name in cols
@@ -4,92 +4,169 @@ Revision ID: 20251222_add_activity_manager
 Revises: 20250323_add_joined_at_room_members
 Create Date: 2025-12-22
 """
+import logging
+import os
+
 from alembic import op
 import sqlalchemy as sa
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects import postgresql
+from pgvector.sqlalchemy import HALFVEC
+
+from migration_helpers import (
+    INDEX_MAINTENANCE_WORK_MEM,
+    IVFFLAT_MIN_TRAINING_ROWS,
+    column_names,
+    create_indexes_in_parallel,
+    estimated_row_count,
+    ivfflat_lists,
+)
 
 revision = '20251222_add_activity_manager'
 down_revision = '20250323_add_joined_at_room_members'
 branch_labels = None
 depends_on = None
 
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Activity embeddings are stored as halfvec (2 bytes/dim) and searched through HNSW by
+# default; VECTOR_INDEX_TYPE=ivfflat trades recall/latency for a cheaper build. Unlike
+# ivfflat, HNSW has no training step, so building it right after CREATE TABLE on an
+# empty table is safe.
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw").lower()
+HNSW_M = int(os.getenv("ACTIVITY_HNSW_M", "24"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("ACTIVITY_HNSW_EF_CONSTRUCTION", "100"))
+
+# Applied to every index build connection. Vector builds are much faster when the
+# graph fits in memory and can use parallel workers.
+INDEX_BUILD_SETTINGS = {
+    'maintenance_work_mem': INDEX_MAINTENANCE_WORK_MEM,
+    'max_parallel_maintenance_workers': '4',
+}
+
+
+def _index(name, table, columns, **kw):
+    t = sa.Table(table, sa.MetaData(), *(sa.Column(column) for column in columns))
+    return sa.Index(name, *(t.c[column] for column in columns), **kw)
+
+
+def _embedding_index(bind, name, table, column):
+    if VECTOR_INDEX_TYPE == 'ivfflat':
+        rows = estimated_row_count(bind, table)
+        if rows >= IVFFLAT_MIN_TRAINING_ROWS:
+            return _index(name, table, [column],
+                          postgresql_using='ivfflat',
+                          postgresql_with={'lists': ivfflat_lists(rows)},
+                          postgresql_ops={column: 'halfvec_cosine_ops'})
+        logger.warning("Only ~%d rows in %s to train ivfflat on; building HNSW for %s instead",
+                       rows, table, name)
+
+    return _index(name, table, [column],
+                  postgresql_using='hnsw',
+                  postgresql_with={'m': HNSW_M, 'ef_construction': HNSW_EF_CONSTRUCTION},
+                  postgresql_ops={column: 'halfvec_cosine_ops'})
+
+
+def _column_type(bind, table, column):
+    """Postgres type of ``table.column`` as format_type() renders it (None elsewhere)."""
+    if bind.dialect.name != "postgresql":
+        return None
+    return bind.execute(
+        sa.text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = CAST(:table AS regclass) AND attname = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
 def upgrade():
     bind = op.get_bind()
     insp = sa.inspect(bind)
 
-    # Create user_status table
-    op.create_table(
-        'user_status',
-        sa.Column('user_id', sa.String(), nullable=False),
-        sa.Column('current_status', sa.Text(), nullable=False),
-        sa.Column('status_embedding', Vector(1536), nullable=True),
-        sa.Column('raw_activity_text', sa.Text(), nullable=True),
-        sa.Column('room_id', sa.String(), nullable=True),
-        sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.func.now()),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
-        sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
-        sa.PrimaryKeyConstraint('user_id')
-    )
-
-    op.create_index('idx_user_status_updated', 'user_status', ['last_updated'], postgresql_ops={'last_updated': 'DESC'})
-    op.create_index('idx_user_status_embedding', 'user_status', ['status_embedding'],
-                    postgresql_using='ivfflat',
-                    postgresql_with={'lists': 100},
-                    postgresql_ops={'status_embedding': 'vector_cosine_ops'})
-
-    if not insp.has_table("user_actions"):
-        op.create_table(
-            'user_actions',
-            sa.Column('id', sa.Integer(), primary_key=True),
-            sa.Column('user_id', sa.String(), nullable=False),
-            sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now()),
-            sa.Column('tool', sa.String(), nullable=False),
-            sa.Column('action_type', sa.String(), nullable=False),
-            sa.Column('action_data', sa.JSON(), nullable=False),
-            sa.Column('task_id', sa.String(), nullable=True),
-            sa.Column('session_id', sa.String(), nullable=True),
-            sa.Column('activity_summary', sa.Text(), nullable=True),
-            sa.Column('activity_embedding', Vector(1536), nullable=True),
-            sa.Column('similarity_to_status', sa.Float(), nullable=True),
-            sa.Column('similarity_to_previous', sa.Float(), nullable=True),
-            sa.Column('is_status_change', sa.Boolean(), server_default='false'),
-            sa.Column('room_id', sa.String(), nullable=True),
-            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
-            sa.ForeignKeyConstraint(['task_id'], ['tasks.id']),
-            sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
-        )
-        op.create_index('ix_user_actions_user_id', 'user_actions', ['user_id'])
-        op.create_index('ix_user_actions_timestamp', 'user_actions', ['timestamp'])
-        op.create_index('ix_user_actions_task_id', 'user_actions', ['task_id'])
-        op.create_index('ix_user_actions_session_id', 'user_actions', ['session_id'])
-    else:
-        op.add_column('user_actions', sa.Column('activity_summary', sa.Text(), nullable=True))
-        op.add_column('user_actions', sa.Column('activity_embedding', Vector(1536), nullable=True))
-        op.add_column('user_actions', sa.Column('similarity_to_status', sa.Float(), nullable=True))
-        op.add_column('user_actions', sa.Column('similarity_to_previous', sa.Float(), nullable=True))
-        op.add_column('user_actions', sa.Column('is_status_change', sa.Boolean(), server_default='false'))
-        op.add_column('user_actions', sa.Column('room_id', sa.String(), nullable=True))
-
-        op.create_foreign_key('user_actions_room_id_fkey', 'user_actions', 'rooms', ['room_id'], ['id'])
-
-        op.create_index('idx_user_actions_embedding', 'user_actions', ['activity_embedding'],
-                        postgresql_using='ivfflat',
-                        postgresql_with={'lists': 100},
-                        postgresql_ops={'activity_embedding': 'vector_cosine_ops'})
-        op.create_index('idx_user_actions_room_id', 'user_actions', ['room_id'])
-        op.create_index('idx_user_actions_status_change', 'user_actions', ['is_status_change'],
-                        postgresql_where=sa.text('is_status_change = true'))
-
-        return
-
-    op.create_index('idx_user_actions_embedding', 'user_actions', ['activity_embedding'],
-                    postgresql_using='ivfflat',
-                    postgresql_with={'lists': 100},
-                    postgresql_ops={'activity_embedding': 'vector_cosine_ops'})
-    op.create_index('idx_user_actions_room_id', 'user_actions', ['room_id'])
-    op.create_index('idx_user_actions_status_change', 'user_actions', ['is_status_change'],
-                    postgresql_where=sa.text('is_status_change = true'))
+    # Each table's DDL commits on its own, so a failure further down (typically an
+    # index build on a large user_actions) resumes from the last committed step
+    # instead of redoing everything; every step is guarded so a re-run skips it.
+    if not insp.has_table('user_status'):
+        with op.get_context().autocommit_block():
+            op.create_table(
+                'user_status',
+                sa.Column('user_id', sa.String(), nullable=False),
+                sa.Column('current_status', sa.Text(), nullable=False),
+                sa.Column('status_embedding', HALFVEC(1536), nullable=True),
+                sa.Column('raw_activity_text', sa.Text(), nullable=True),
+                sa.Column('room_id', sa.String(), nullable=True),
+                sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.func.now()),
+                sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+                sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+                sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+                sa.PrimaryKeyConstraint('user_id')
+            )
+
+    indexes = [
+        _index('idx_user_status_updated', 'user_status', ['last_updated'], postgresql_ops={'last_updated': 'DESC'}),
+        _embedding_index(bind, 'idx_user_status_embedding', 'user_status', 'status_embedding'),
+    ]
+
+    user_action_cols = column_names(insp, "user_actions")
+    with op.get_context().autocommit_block():
+        if not user_action_cols:
+            op.create_table(
+                'user_actions',
+                sa.Column('id', sa.Integer(), primary_key=True),
+                sa.Column('user_id', sa.String(), nullable=False),
+                sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now()),
+                sa.Column('tool', sa.String(), nullable=False),
+                sa.Column('action_type', sa.String(), nullable=False),
+                sa.Column('action_data', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False),
+                sa.Column('task_id', sa.String(), nullable=True),
+                sa.Column('session_id', sa.String(), nullable=True),
+                sa.Column('activity_summary', sa.Text(), nullable=True),
+                sa.Column('activity_embedding', HALFVEC(1536), nullable=True),
+                sa.Column('similarity_to_status', sa.Float(), nullable=True),
+                sa.Column('similarity_to_previous', sa.Float(), nullable=True),
+                sa.Column('is_status_change', sa.Boolean(), server_default='false'),
+                sa.Column('room_id', sa.String(), nullable=True),
+                sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+                sa.ForeignKeyConstraint(['task_id'], ['tasks.id']),
+                sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+            )
+            indexes += [
+                _index('ix_user_actions_user_id', 'user_actions', ['user_id']),
+                _index('ix_user_actions_timestamp', 'user_actions', ['timestamp']),
+                _index('ix_user_actions_task_id', 'user_actions', ['task_id']),
+                _index('ix_user_actions_session_id', 'user_actions', ['session_id']),
+            ]
+        else:
+            for column in (
+                sa.Column('activity_summary', sa.Text(), nullable=True),
+                sa.Column('activity_embedding', HALFVEC(1536), nullable=True),
+                sa.Column('similarity_to_status', sa.Float(), nullable=True),
+                sa.Column('similarity_to_previous', sa.Float(), nullable=True),
+                sa.Column('is_status_change', sa.Boolean(), server_default='false'),
+                sa.Column('room_id', sa.String(), nullable=True),
+            ):
+                if column.name not in user_action_cols:
+                    op.add_column('user_actions', column)
+            if _column_type(bind, 'user_actions', 'activity_embedding') == 'vector(1536)':
+                # A pre-existing vector column must match the halfvec opclass used below
+                op.execute("ALTER TABLE user_actions ALTER COLUMN activity_embedding TYPE halfvec(1536)")
+
+            if 'user_actions_room_id_fkey' not in {fk['name'] for fk in insp.get_foreign_keys('user_actions')}:
+                op.create_foreign_key('user_actions_room_id_fkey', 'user_actions', 'rooms', ['room_id'], ['id'])
+
+    indexes += [
+        _embedding_index(bind, 'idx_user_actions_embedding', 'user_actions', 'activity_embedding'),
+        _index('idx_user_actions_room_id', 'user_actions', ['room_id']),
+        _index('idx_user_actions_status_change', 'user_actions', ['is_status_change'],
+               postgresql_where=sa.text('is_status_change = true')),
+    ]
+
+    # The table/column DDL is committed by now, so the builds don't wait on this
+    # transaction's locks. Build every index at once; on an existing user_actions
+    # table this takes roughly as long as the slowest build.
+    with op.get_context().autocommit_block():
+        create_indexes_in_parallel(bind, indexes, settings=INDEX_BUILD_SETTINGS)
+
 
 def downgrade():
     # Drop indexes
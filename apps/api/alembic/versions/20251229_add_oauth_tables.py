@@ -14,6 +14,51 @@ down_revision = '20251222_add_cached_summary_to_messages'
 branch_labels = None
 depends_on = None
 
+# Refresh/access token ids are uuid4 strings (the access token id is the JWT jti).
+# Stored as native uuid they take 16 bytes instead of 36 in these high-churn tables
+# and their indexes; as_uuid=False keeps them plain strings on the Python side.
+_TOKEN_ID = postgresql.UUID(as_uuid=False)
+
+# jsonb on Postgres: stored pre-parsed, so reads don't re-parse the text every time
+_JSON = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+# (name, table, column, unique) for every single-column index on the OAuth tables
+_INDEXES = [
+    ('ix_oauth_clients_id', 'oauth_clients', 'id', False),
+    ('ix_oauth_authorization_codes_id', 'oauth_authorization_codes', 'id', False),
+    ('ix_oauth_authorization_codes_client_id', 'oauth_authorization_codes', 'client_id', False),
+    ('ix_oauth_authorization_codes_user_id', 'oauth_authorization_codes', 'user_id', False),
+    ('ix_oauth_refresh_tokens_id', 'oauth_refresh_tokens', 'id', False),
+    ('ix_oauth_refresh_tokens_token_hash', 'oauth_refresh_tokens', 'token_hash', True),
+    ('ix_oauth_refresh_tokens_client_id', 'oauth_refresh_tokens', 'client_id', False),
+    ('ix_oauth_refresh_tokens_user_id', 'oauth_refresh_tokens', 'user_id', False),
+    ('ix_oauth_access_tokens_id', 'oauth_access_tokens', 'id', False),
+    ('ix_oauth_access_tokens_token_hash', 'oauth_access_tokens', 'token_hash', False),
+    ('ix_oauth_access_tokens_client_id', 'oauth_access_tokens', 'client_id', False),
+    ('ix_oauth_access_tokens_user_id', 'oauth_access_tokens', 'user_id', False),
+    ('ix_oauth_access_tokens_refresh_token_id', 'oauth_access_tokens', 'refresh_token_id', False),
+]
+
+# Default VS Code extension client, seeded with bound parameters so the same insert
+# works on every dialect
+_oauth_clients = sa.table(
+    'oauth_clients',
+    sa.column('id', sa.String()),
+    sa.column('name', sa.String()),
+    sa.column('client_type', sa.String()),
+    sa.column('redirect_uris', _JSON),
+    sa.column('allowed_scopes', _JSON),
+    sa.column('is_active', sa.Boolean()),
+)
+_VSCODE_CLIENT = {
+    'id': 'vscode-extension',
+    'name': 'Parallel VS Code Extension',
+    'client_type': 'public',
+    'redirect_uris': ['vscode://parallel.parallel-vscode/auth-callback', 'http://localhost:54321/callback'],
+    'allowed_scopes': ['openid', 'profile', 'email', 'tasks:read', 'tasks:write', 'chats:read', 'chats:write', 'workspaces:read'],
+    'is_active': True,
+}
+
 
 def upgrade() -> None:
     # OAuth Clients table
@@ -23,14 +68,13 @@ def upgrade() -> None:
         sa.Column('name', sa.String(), nullable=False),
         sa.Column('client_type', sa.String(), nullable=False, server_default='public'),
         sa.Column('client_secret_hash', sa.String(), nullable=True),
-        sa.Column('redirect_uris', sa.JSON(), nullable=False, server_default='[]'),
-        sa.Column('allowed_scopes', sa.JSON(), nullable=False, server_default='[]'),
+        sa.Column('redirect_uris', _JSON, nullable=False, server_default='[]'),
+        sa.Column('allowed_scopes', _JSON, nullable=False, server_default='[]'),
         sa.Column('is_active', sa.Boolean(), nullable=False, server_default='true'),
         sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
         sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_oauth_clients_id'), 'oauth_clients', ['id'], unique=False)
 
     # OAuth Authorization Codes table
     op.create_table(
@@ -49,14 +93,11 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_oauth_authorization_codes_id'), 'oauth_authorization_codes', ['id'], unique=False)
-    op.create_index(op.f('ix_oauth_authorization_codes_client_id'), 'oauth_authorization_codes', ['client_id'], unique=False)
-    op.create_index(op.f('ix_oauth_authorization_codes_user_id'), 'oauth_authorization_codes', ['user_id'], unique=False)
 
     # OAuth Refresh Tokens table
     op.create_table(
         'oauth_refresh_tokens',
-        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('id', _TOKEN_ID, server_default=sa.text('gen_random_uuid()'), nullable=False),
         sa.Column('token_hash', sa.String(), nullable=False),
         sa.Column('client_id', sa.String(), nullable=False),
         sa.Column('user_id', sa.String(), nullable=False),
@@ -64,25 +105,21 @@ def upgrade() -> None:
         sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
         sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
         sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
-        sa.Column('replaced_by_id', sa.String(), nullable=True),
+        sa.Column('replaced_by_id', _TOKEN_ID, nullable=True),
         sa.ForeignKeyConstraint(['client_id'], ['oauth_clients.id'], ),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
         sa.ForeignKeyConstraint(['replaced_by_id'], ['oauth_refresh_tokens.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_oauth_refresh_tokens_id'), 'oauth_refresh_tokens', ['id'], unique=False)
-    op.create_index(op.f('ix_oauth_refresh_tokens_token_hash'), 'oauth_refresh_tokens', ['token_hash'], unique=True)
-    op.create_index(op.f('ix_oauth_refresh_tokens_client_id'), 'oauth_refresh_tokens', ['client_id'], unique=False)
-    op.create_index(op.f('ix_oauth_refresh_tokens_user_id'), 'oauth_refresh_tokens', ['user_id'], unique=False)
 
     # OAuth Access Tokens table
     op.create_table(
         'oauth_access_tokens',
-        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('id', _TOKEN_ID, server_default=sa.text('gen_random_uuid()'), nullable=False),
         sa.Column('token_hash', sa.String(), nullable=True),
         sa.Column('client_id', sa.String(), nullable=False),
         sa.Column('user_id', sa.String(), nullable=False),
-        sa.Column('refresh_token_id', sa.String(), nullable=True),
+        sa.Column('refresh_token_id', _TOKEN_ID, nullable=True),
         sa.Column('scope', sa.String(), nullable=False),
         sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
         sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
@@ -92,27 +129,21 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['refresh_token_id'], ['oauth_refresh_tokens.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_oauth_access_tokens_id'), 'oauth_access_tokens', ['id'], unique=False)
-    op.create_index(op.f('ix_oauth_access_tokens_token_hash'), 'oauth_access_tokens', ['token_hash'], unique=False)
-    op.create_index(op.f('ix_oauth_access_tokens_client_id'), 'oauth_access_tokens', ['client_id'], unique=False)
-    op.create_index(op.f('ix_oauth_access_tokens_user_id'), 'oauth_access_tokens', ['user_id'], unique=False)
-    op.create_index(op.f('ix_oauth_access_tokens_refresh_token_id'), 'oauth_access_tokens', ['refresh_token_id'], unique=False)
-
-    # Insert default VS Code extension client
-    op.execute("""
-        INSERT INTO oauth_clients (id, name, client_type, redirect_uris, allowed_scopes, is_active, created_at, updated_at)
-        VALUES (
-            'vscode-extension',
-            'Parallel VS Code Extension',
-            'public',
-            '["vscode://parallel.parallel-vscode/auth-callback", "http://localhost:54321/callback"]',
-            '["openid", "profile", "email", "tasks:read", "tasks:write", "chats:read", "chats:write", "workspaces:read"]',
-            true,
-            now(),
-            now()
+
+    # Create every index in one round-trip on Postgres instead of one statement per index
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            ';\n'.join(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({column})"
+                for name, table, column, unique in _INDEXES
+            )
         )
-        ON CONFLICT (id) DO NOTHING
-    """)
+    else:
+        for name, table, column, unique in _INDEXES:
+            op.create_index(op.f(name), table, [column], unique=unique)
+
+    op.bulk_insert(_oauth_clients, [_VSCODE_CLIENT])
 
 
 def downgrade() -> None:
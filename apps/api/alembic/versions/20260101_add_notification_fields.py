@@ -6,6 +6,9 @@ Create Date: 2026-01-01
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migration_helpers import has_column
 
 # revision identifiers, used by Alembic.
 revision = '20260101_add_notification_fields'
@@ -31,26 +34,38 @@ def upgrade() -> None:
             sa.Column('task_id', sa.String(), nullable=True),
             sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
             sa.Column('is_read', sa.Boolean(), server_default='false', nullable=True),
-            sa.Column('data', sa.JSON(), nullable=True),
+            sa.Column('data', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
             sa.ForeignKeyConstraint(['user_id'], ['users.id']),
             sa.ForeignKeyConstraint(['task_id'], ['tasks.id']),
         )
         op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
     else:
         # Add severity column (default 'normal')
-        op.add_column('notifications', sa.Column('severity', sa.String(), server_default='normal', nullable=True))
+        if not has_column(insp, 'notifications', 'severity'):
+            op.add_column('notifications', sa.Column('severity', sa.String(), server_default='normal', nullable=True))
         # Add source_type column (nullable)
-        op.add_column('notifications', sa.Column('source_type', sa.String(), nullable=True))
+        if not has_column(insp, 'notifications', 'source_type'):
+            op.add_column('notifications', sa.Column('source_type', sa.String(), nullable=True))
 
-    # Create indexes for better query performance
-    op.create_index(op.f('ix_notifications_severity'), 'notifications', ['severity'], unique=False)
-    op.create_index(op.f('ix_notifications_source_type'), 'notifications', ['source_type'], unique=False)
+    # Notifications are read as "unread for this user, newest first" (plus the
+    # urgent-unread count), so index only the unread rows instead of every row's
+    # severity/source_type. Built CONCURRENTLY since notifications may already be large.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notifications_user_unread',
+            'notifications',
+            ['user_id', 'severity', sa.text('created_at DESC')],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('is_read = false'),
+            sqlite_where=sa.text('is_read = 0'),
+        )
 
 
 def downgrade() -> None:
     # Remove indexes
-    op.drop_index(op.f('ix_notifications_source_type'), table_name='notifications')
-    op.drop_index(op.f('ix_notifications_severity'), table_name='notifications')
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
 
     # Remove columns
     op.drop_column('notifications', 'source_type')
@@ -7,6 +7,8 @@ Create Date: 2026-01-02 00:00:00
 from alembic import op
 import sqlalchemy as sa
 
+from migration_helpers import column_names
+
 
 # revision identifiers, used by Alembic.
 revision = "20260102_add_notifications_severity"
@@ -16,24 +18,37 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Add severity column (defaults to 'normal' for existing rows)
-    op.add_column(
-        "notifications",
-        sa.Column("severity", sa.String(), server_default="normal", nullable=True),
-    )
-    op.add_column(
-        "notifications",
-        sa.Column("source_type", sa.String(), nullable=True),
-    )
-    op.create_index(
-        op.f("ix_notifications_severity"),
-        "notifications",
-        ["severity"],
-        unique=False,
-    )
+    # 20260101_add_notification_fields (an ancestor of this revision) already adds
+    # these columns and ix_notifications_user_unread, so only fill in whatever is
+    # missing on databases that were stamped past it. Skipping the ADDs also avoids another ACCESS
+    # EXCLUSIVE lock cycle on notifications.
+    insp = sa.inspect(op.get_bind())
+    cols = column_names(insp, "notifications")
+    if "severity" not in cols:
+        # Constant default keeps the ADD COLUMN metadata-only on Postgres 11+
+        op.add_column(
+            "notifications",
+            sa.Column("severity", sa.String(), server_default="normal", nullable=True),
+        )
+    if "source_type" not in cols:
+        op.add_column(
+            "notifications",
+            sa.Column("source_type", sa.String(), nullable=True),
+        )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notifications_user_unread",
+            "notifications",
+            ["user_id", "severity", sa.text("created_at DESC")],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("is_read = false"),
+            sqlite_where=sa.text("is_read = 0"),
+        )
 
 
 def downgrade() -> None:
-    op.drop_index(op.f("ix_notifications_severity"), table_name="notifications")
-    op.drop_column("notifications", "source_type")
-    op.drop_column("notifications", "severity")
+    # The columns and index belong to 20260101_add_notification_fields, whose
+    # downgrade removes them; dropping them here would break that revision.
+    pass
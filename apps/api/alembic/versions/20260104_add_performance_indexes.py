@@ -1,8 +1,8 @@
 """Add performance indexes for boot optimization
 
 This migration adds database indexes to optimize the following queries:
-1. Users filtered by org_id (for /api/team endpoint)
-2. ChatInstances ordered by last_message_at (for chat list ordering)
+1. Users filtered by org_id (for /api/team endpoint), covering the team projection
+2. ChatInstances filtered by room_id, ordered by last_message_at (for chat list ordering)
 
 These indexes eliminate full table scans and improve query performance
 from O(n) to O(log n) for filtered/sorted queries.
@@ -26,40 +26,47 @@ depends_on = None
 def upgrade():
     """Add performance indexes"""
 
-    # Index for Users.org_id - optimizes /api/team query
-    # Query: SELECT * FROM users WHERE org_id = ? LIMIT 500
-    op.create_index(
-        "ix_users_org_id",
-        "users",
-        ["org_id"],
-        unique=False,
-        if_not_exists=True,
-    )
+    # These tables are live; build every index CONCURRENTLY (outside the migration
+    # transaction) so reads and writes keep flowing on Postgres.
+    with op.get_context().autocommit_block():
+        # Index for Users.org_id - optimizes /api/team query
+        # Query: SELECT id, email, name, org_id FROM users WHERE org_id = ? LIMIT 500
+        # INCLUDE covers the team projection so Postgres can answer with an Index Only Scan.
+        op.create_index(
+            "ix_users_org_id",
+            "users",
+            ["org_id"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_include=["id", "email", "name"],
+        )
+        if op.get_bind().dialect.name == "postgresql":
+            # Populate the visibility map so Index Only Scans skip heap fetches right away
+            op.execute("VACUUM (ANALYZE) users")
 
-    # Index for ChatInstances.last_message_at - optimizes chat list ordering
-    # Query: SELECT * FROM chat_instances WHERE room_id = ? ORDER BY last_message_at DESC
-    op.create_index(
-        "ix_chat_instances_last_message_at",
-        "chat_instances",
-        ["last_message_at"],
-        unique=False,
-        if_not_exists=True,
-    )
-
-    # Composite index for ChatInstances - optimizes both filter and sort
-    # This is more efficient than separate indexes for room_id queries with ordering
-    op.create_index(
-        "ix_chat_instances_room_last_message",
-        "chat_instances",
-        ["room_id", "last_message_at"],
-        unique=False,
-        if_not_exists=True,
-    )
+        # Composite index for ChatInstances - optimizes both filter and sort
+        # Query: SELECT * FROM chat_instances WHERE room_id = ? ORDER BY last_message_at DESC
+        # Sorted DESC so the ordering is read straight off the index; a separate
+        # last_message_at index would only add write amplification.
+        op.create_index(
+            "ix_chat_instances_room_last_message",
+            "chat_instances",
+            ["room_id", sa.text("last_message_at DESC")],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
 
 
 def downgrade():
     """Remove performance indexes"""
 
-    op.drop_index("ix_chat_instances_room_last_message", table_name="chat_instances")
-    op.drop_index("ix_chat_instances_last_message_at", table_name="chat_instances")
-    op.drop_index("ix_users_org_id", table_name="users")
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_instances_room_last_message",
+            table_name="chat_instances",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_users_org_id", table_name="users", if_exists=True, postgresql_concurrently=True)
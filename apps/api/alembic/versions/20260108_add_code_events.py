@@ -8,6 +8,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from migration_helpers import create_month_partitions
+
 
 # revision identifiers, used by Alembic.
 revision = "20260108_add_code_events"
@@ -18,10 +20,14 @@ depends_on = None
 
 def upgrade() -> None:
     """Create code_events table for tracking code changes."""
-    # Create code_events table
+    bind = op.get_bind()
+
+    # Create code_events table, range-partitioned by month on Postgres: reads are
+    # scoped to recent windows (pruned to a few partitions) and retention can drop
+    # whole months. The partition key has to be part of the primary key.
     op.create_table(
         "code_events",
-        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text("gen_random_uuid()")),
         sa.Column("org_id", sa.String(), nullable=False),
         sa.Column("user_id", sa.String(), nullable=False),
         sa.Column("device_id", sa.Text(), nullable=False),
@@ -37,21 +43,30 @@ def upgrade() -> None:
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.ForeignKeyConstraint(["org_id"], ["organizations.id"], name="fk_code_events_org_id"),
         sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="fk_code_events_user_id"),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
     )
+    if bind.dialect.name == "postgresql":
+        create_month_partitions(bind, "code_events")
+
+    # Indexes on the partitioned parent cascade to every partition. They can't be
+    # built CONCURRENTLY, but the table was created empty just above.
 
     # Create composite index for primary queries (org + repo + time)
     op.create_index(
         "ix_code_events_org_repo_created",
         "code_events",
         ["org_id", "repo_id", sa.text("created_at DESC")],
+        if_not_exists=True,
     )
 
-    # Create GIN indexes for array columns (efficient array containment queries)
-    op.execute(
-        "CREATE INDEX ix_code_events_files_touched ON code_events USING GIN (files_touched)"
-    )
+    # One multi-column GIN index serves overlap/containment filters on either
+    # array (GIN can match any subset of its columns) with a single tree and
+    # pending list to maintain per insert.
     op.execute(
-        "CREATE INDEX ix_code_events_systems_touched ON code_events USING GIN (systems_touched)"
+        "CREATE INDEX IF NOT EXISTS ix_code_events_arrays "
+        "ON code_events USING GIN (files_touched, systems_touched) "
+        "WITH (fastupdate = on, gin_pending_list_limit = 8192)"
     )
 
     # Create index on user_id for user-specific queries
@@ -59,13 +74,14 @@ def upgrade() -> None:
         "ix_code_events_user_id",
         "code_events",
         ["user_id"],
+        if_not_exists=True,
     )
 
 
 def downgrade() -> None:
     """Drop code_events table and all indexes."""
-    op.drop_index("ix_code_events_user_id", table_name="code_events")
-    op.drop_index("ix_code_events_systems_touched", table_name="code_events")
-    op.drop_index("ix_code_events_files_touched", table_name="code_events")
-    op.drop_index("ix_code_events_org_repo_created", table_name="code_events")
+    op.execute("DROP INDEX IF EXISTS ix_code_events_user_id")
+    op.execute("DROP INDEX IF EXISTS ix_code_events_arrays")
+    op.execute("DROP INDEX IF EXISTS ix_code_events_org_repo_created")
+    # Dropping the partitioned parent drops its partitions too
     op.drop_table("code_events")
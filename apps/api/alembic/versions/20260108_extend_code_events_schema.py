@@ -15,6 +15,14 @@ down_revision = "20260108_add_code_events"
 branch_labels = None
 depends_on = None
 
+# code_events is partitioned on Postgres, and indexes on a partitioned table can't be
+# built or dropped CONCURRENTLY
+_ARRAYS_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_code_events_arrays "
+    "ON code_events USING GIN ({columns}) "
+    "WITH (fastupdate = on, gin_pending_list_limit = 8192)"
+)
+
 
 def upgrade() -> None:
     """Add details and impact_tags columns to code_events table."""
@@ -30,14 +38,14 @@ def upgrade() -> None:
         sa.Column("impact_tags", postgresql.ARRAY(sa.Text()), nullable=True)
     )
 
-    # Create GIN index on impact_tags for efficient array containment queries
-    op.execute(
-        "CREATE INDEX ix_code_events_impact_tags ON code_events USING GIN (impact_tags)"
-    )
+    # Fold impact_tags into the shared array GIN index instead of adding a third tree
+    op.execute("DROP INDEX IF EXISTS ix_code_events_arrays")
+    op.execute(_ARRAYS_INDEX.format(columns="files_touched, systems_touched, impact_tags"))
 
 
 def downgrade() -> None:
     """Remove details and impact_tags columns from code_events table."""
-    op.drop_index("ix_code_events_impact_tags", table_name="code_events")
+    op.execute("DROP INDEX IF EXISTS ix_code_events_arrays")
+    op.execute(_ARRAYS_INDEX.format(columns="files_touched, systems_touched"))
     op.drop_column("code_events", "impact_tags")
     op.drop_column("code_events", "details")
@@ -8,6 +8,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from migration_helpers import schema_snapshot
+
 
 # revision identifiers, used by Alembic.
 revision = "20260305_add_event_data_to_app_events"
@@ -17,29 +19,21 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
-    existing_cols = {col["name"] for col in inspector.get_columns("app_events")}
-    if "event_data" in existing_cols:
+    schema = schema_snapshot(sa.inspect(op.get_bind()))
+    if "event_data" in schema.get("app_events", set()):
         return
 
-    try:
-        op.add_column(
-            "app_events",
-            sa.Column(
-                "event_data",
-                postgresql.JSONB(astext_type=sa.Text()),
-                nullable=True,
-            ),
-        )
-    except Exception:
-        # Fallback for non-Postgres (or if JSONB import fails)
-        op.add_column("app_events", sa.Column("event_data", sa.JSON(), nullable=True))
+    op.add_column(
+        "app_events",
+        sa.Column(
+            "event_data",
+            sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql"),
+            nullable=True,
+        ),
+    )
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
-    existing_cols = {col["name"] for col in inspector.get_columns("app_events")}
-    if "event_data" in existing_cols:
+    schema = schema_snapshot(sa.inspect(op.get_bind()))
+    if "event_data" in schema.get("app_events", set()):
         op.drop_column("app_events", "event_data")
@@ -8,6 +8,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from migration_helpers import schema_snapshot
+
 
 # revision identifiers, used by Alembic.
 revision = "20260306_add_graph_system"
@@ -18,14 +20,15 @@ depends_on = None
 
 def upgrade() -> None:
     json_type = postgresql.JSONB(astext_type=sa.Text())
-    bind = op.get_bind()
-    insp = sa.inspect(bind)
-    existing_tables = set(insp.get_table_names())
+    # Graph ids are uuid4 strings: native uuid stores them (and the agent_id foreign
+    # keys and their indexes) in 16 bytes instead of 36; still strings in Python
+    id_type = postgresql.UUID(as_uuid=False)
+    existing_tables = schema_snapshot(sa.inspect(op.get_bind()))
 
     if "graph_agents" not in existing_tables:
         op.create_table(
             "graph_agents",
-            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("id", id_type, primary_key=True),
             sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
             sa.Column("name", sa.String(), nullable=False),
             sa.Column("pipeline_config", json_type, nullable=False, server_default=sa.text("'{}'::jsonb")),
@@ -38,8 +41,8 @@ def upgrade() -> None:
     if "graph_executions" not in existing_tables:
         op.create_table(
             "graph_executions",
-            sa.Column("id", sa.String(), primary_key=True),
-            sa.Column("agent_id", sa.String(), sa.ForeignKey("graph_agents.id"), nullable=False),
+            sa.Column("id", id_type, primary_key=True),
+            sa.Column("agent_id", id_type, sa.ForeignKey("graph_agents.id"), nullable=False),
             sa.Column("status", sa.String(), nullable=False, server_default="pending"),
             sa.Column("input_data", json_type, nullable=True),
             sa.Column("output_data", json_type, nullable=True),
@@ -49,12 +52,21 @@ def upgrade() -> None:
         )
     op.execute(sa.text("CREATE INDEX IF NOT EXISTS ix_graph_executions_agent_id ON graph_executions (agent_id)"))
     op.execute(sa.text("CREATE INDEX IF NOT EXISTS ix_graph_executions_status ON graph_executions (status)"))
+    # Executions are appended in started_at order, so a BRIN summary of each block
+    # range covers "recent runs" scans (bitmap-ANDed with the status index) at a
+    # tiny fraction of a btree's size and write cost.
+    op.execute(
+        sa.text(
+            "CREATE INDEX IF NOT EXISTS ix_graph_executions_started_brin ON graph_executions "
+            "USING BRIN (started_at) WITH (pages_per_range = 32)"
+        )
+    )
 
     if "graph_history" not in existing_tables:
         op.create_table(
             "graph_history",
-            sa.Column("id", sa.String(), primary_key=True),
-            sa.Column("agent_id", sa.String(), sa.ForeignKey("graph_agents.id"), nullable=False),
+            sa.Column("id", id_type, primary_key=True),
+            sa.Column("agent_id", id_type, sa.ForeignKey("graph_agents.id"), nullable=False),
             sa.Column("version", sa.Integer(), nullable=False),
             sa.Column("pipeline_config", json_type, nullable=False),
             sa.Column("change_summary", sa.Text(), nullable=True),
@@ -71,6 +83,7 @@ def downgrade() -> None:
     if op.get_bind().dialect.has_table(op.get_bind(), "graph_history"):
         op.drop_table("graph_history")
 
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_graph_executions_started_brin"))
     op.execute(sa.text("DROP INDEX IF EXISTS ix_graph_executions_status"))
     op.execute(sa.text("DROP INDEX IF EXISTS ix_graph_executions_agent_id"))
     if op.get_bind().dialect.has_table(op.get_bind(), "graph_executions"):
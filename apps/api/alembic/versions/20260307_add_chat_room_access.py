@@ -7,6 +7,8 @@ Create Date: 2026-03-07
 from alembic import op
 import sqlalchemy as sa
 
+from migration_helpers import run_in_keyset_batches
+
 
 # revision identifiers, used by Alembic.
 revision = "20260307_add_chat_room_access"
@@ -25,19 +27,35 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
         sa.PrimaryKeyConstraint("chat_id", "room_id"),
     )
-    op.create_index("idx_chat_room_access_chat", "chat_room_access", ["chat_id"])
-    op.create_index("idx_chat_room_access_room", "chat_room_access", ["room_id"])
-
-    # Backfill existing chat → room links
-    op.execute(
-        """
-        INSERT INTO chat_room_access (chat_id, room_id)
-        SELECT id, room_id
-        FROM chat_instances
-        WHERE room_id IS NOT NULL
-        ON CONFLICT DO NOTHING
-        """
-    )
+
+    is_pg = op.get_bind().dialect.name == "postgresql"
+
+    # Backfill existing chat → room links in chat_instances.id order, committing each
+    # batch so a large install never holds one long transaction
+    with op.get_context().autocommit_block():
+        if is_pg:
+            # Don't wait for a WAL flush on every batch commit. A crash can only lose
+            # the last few batches, never leave the table inconsistent.
+            op.execute("SET synchronous_commit = off")
+        run_in_keyset_batches(
+            op.get_bind(),
+            "chat_instances",
+            "id",
+            """
+            INSERT INTO chat_room_access (chat_id, room_id)
+            SELECT id, room_id
+            FROM chat_instances
+            WHERE room_id IS NOT NULL AND {batch}
+            ON CONFLICT DO NOTHING
+            """,
+        )
+        if is_pg:
+            op.execute("RESET synchronous_commit")
+
+        # Built once the rows are in, as one sorted bulk load each instead of an index
+        # insert per backfilled row
+        for name, column in (("idx_chat_room_access_chat", "chat_id"), ("idx_chat_room_access_room", "room_id")):
+            op.create_index(name, "chat_room_access", [column], if_not_exists=True, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
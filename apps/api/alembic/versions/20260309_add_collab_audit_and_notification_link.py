@@ -22,7 +22,8 @@ def upgrade():
 
     op.create_table(
         "collaboration_audit_runs",
-        sa.Column("id", sa.String(), primary_key=True),
+        # Same uuid4 ids as collaboration_signals (the audit's request_id)
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True, server_default=sa.text("gen_random_uuid()")),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
         sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
         sa.Column("stats", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
@@ -5,38 +5,92 @@ Revises: 20260309_add_collab_audit_and_notification_link
 Create Date: 2026-03-10
 """
 
+import logging
+
 from alembic import op
 import sqlalchemy as sa
 
+from migration_helpers import INDEX_MAINTENANCE_WORK_MEM
+
 # revision identifiers, used by Alembic.
 revision = "20260310_add_bootstrap_indexes"
 down_revision = "20260309_add_collab_audit_and_notification_link"
 branch_labels = None
 depends_on = None
 
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# (name, table, column) for the lookups the bootstrap/rooms endpoints rely on
+BOOTSTRAP_INDEXES = [
+    ("idx_chat_instances_room_id", "chat_instances", "room_id"),
+    ("idx_room_member_user_id", "room_members", "user_id"),
+    ("idx_room_member_room_id", "room_members", "room_id"),
+    ("idx_chat_room_access_room_id", "chat_room_access", "room_id"),
+    ("idx_chat_room_access_chat_id", "chat_room_access", "chat_id"),
+]
+
+
+def _leading_index(insp, table, column):
+    """Name of an existing index (or the primary key) that starts with ``column``, if any."""
+    for ix in insp.get_indexes(table):
+        if ix["column_names"][:1] == [column]:
+            return ix["name"]
+    pk = insp.get_pk_constraint(table)
+    if pk["constrained_columns"][:1] == [column]:
+        return pk["name"]
+    return None
+
+
+def _prewarm(bind, index_names):
+    """Load the indexes behind the bootstrap lookups into shared_buffers, so the first
+    requests after a deploy don't read them from disk. Best effort: pg_prewarm isn't
+    available (or creatable) on every managed Postgres."""
+    try:
+        bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_prewarm"))
+        for name in index_names:
+            bind.execute(sa.text("SELECT pg_prewarm(CAST(:name AS regclass), 'buffer')"), {"name": name})
+    except sa.exc.DBAPIError as exc:
+        logger.warning("Skipping index prewarm: %s", exc.orig)
+
 
 def upgrade():
-    # Safe indexes; if they already exist, PostgreSQL will error, so use IF NOT EXISTS where supported
-    op.execute(
-        "CREATE INDEX IF NOT EXISTS idx_chat_instances_room_id ON chat_instances (room_id)"
-    )
-    op.execute(
-        "CREATE INDEX IF NOT EXISTS idx_room_member_user_id ON room_members (user_id)"
-    )
-    op.execute(
-        "CREATE INDEX IF NOT EXISTS idx_room_member_room_id ON room_members (room_id)"
-    )
-    op.execute(
-        "CREATE INDEX IF NOT EXISTS idx_chat_room_access_room_id ON chat_room_access (room_id)"
-    )
-    op.execute(
-        "CREATE INDEX IF NOT EXISTS idx_chat_room_access_chat_id ON chat_room_access (chat_id)"
-    )
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    is_pg = bind.dialect.name == "postgresql"
+    # Every one of these columns is normally indexed by an earlier revision already
+    # (ix_chat_instances_room_id, ix_room_members_*, idx_chat_room_access_* and the
+    # chat_room_access primary key); only build what is actually missing, so writes
+    # don't pay for a second identical btree.
+    missing = []
+    serving = set()
+    for name, table, column in BOOTSTRAP_INDEXES:
+        existing = _leading_index(insp, table, column)
+        if existing is None:
+            missing.append((name, table, column))
+        serving.add(existing or name)
+
+    with op.get_context().autocommit_block():
+        if missing:
+            if is_pg:
+                # Session-level so each build sorts in memory; SET LOCAL would be a no-op here
+                op.execute(f"SET maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'")
+                op.execute("SET max_parallel_maintenance_workers = 4")
+            for name, table, column in missing:
+                op.create_index(name, table, [column], if_not_exists=True, postgresql_concurrently=True)
+            if is_pg:
+                op.execute("RESET max_parallel_maintenance_workers")
+                op.execute("RESET maintenance_work_mem")
+
+        if is_pg:
+            _prewarm(bind, sorted(serving))
 
 
 def downgrade():
-    op.execute("DROP INDEX IF EXISTS idx_chat_room_access_chat_id")
-    op.execute("DROP INDEX IF EXISTS idx_chat_room_access_room_id")
-    op.execute("DROP INDEX IF EXISTS idx_room_member_room_id")
-    op.execute("DROP INDEX IF EXISTS idx_room_member_user_id")
-    op.execute("DROP INDEX IF EXISTS idx_chat_instances_room_id")
+    names = [name for name, _, _ in reversed(BOOTSTRAP_INDEXES)]
+    if op.get_bind().dialect.name == "postgresql":
+        # Postgres drops them all in one statement and one round-trip
+        op.execute(f"DROP INDEX IF EXISTS {', '.join(names)}")
+    else:
+        for name in names:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
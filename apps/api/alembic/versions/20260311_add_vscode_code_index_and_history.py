@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 try:
     from pgvector.sqlalchemy import Vector
@@ -33,14 +34,15 @@ def upgrade():
 
     op.create_table(
         "code_index_entries",
-        sa.Column("id", sa.String(), primary_key=True),
+        # Always a server-generated uuid4 (agent_edit_history ids below are client-supplied)
+        sa.Column("id", postgresql.UUID(as_uuid=False).with_variant(sa.String(), "sqlite"), primary_key=True),
         sa.Column("workspace_id", sa.String(), sa.ForeignKey("rooms.id"), nullable=False),
         sa.Column("file_path", sa.String(), nullable=False),
         sa.Column("language", sa.String(), nullable=True),
         sa.Column("symbol", sa.String(), nullable=True),
         sa.Column("chunk_index", sa.Integer(), nullable=False, server_default="0"),
         sa.Column("content", sa.Text(), nullable=False),
-        sa.Column("metadata", sa.JSON(), nullable=True),
+        sa.Column("metadata", sa.JSON().with_variant(postgresql.JSONB(), "postgresql"), nullable=True),
         sa.Column("embedding", embedding_type, nullable=True),
         sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
         sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
@@ -60,11 +62,8 @@ def upgrade():
         "code_index_entries",
         ["workspace_id", "file_path"],
     )
-    if is_postgres:
-        op.execute(
-            "CREATE INDEX IF NOT EXISTS code_index_entries_embedding_idx "
-            "ON code_index_entries USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);"
-        )
+    # code_index_entries_embedding_idx is built by 20260331_build_embedding_indexes,
+    # once there are embeddings to size and train it on.
 
     op.create_table(
         "agent_edit_history",
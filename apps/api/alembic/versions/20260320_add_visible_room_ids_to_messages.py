@@ -15,19 +15,22 @@ depends_on = None
 
 
 def upgrade():
+    # Nullable with no default, so on Postgres this is a catalog-only change. Existing
+    # messages are deliberately not backfilled: readers (rag.py) already treat a NULL
+    # or empty array as "visible in room_id only", so rewriting every row to
+    # ARRAY[room_id] would only bloat messages. Rows get a value when one is written.
     op.add_column("messages", sa.Column("visible_room_ids", sa.ARRAY(sa.UUID()), nullable=True))
-    op.execute(
-        """
-        UPDATE messages
-        SET visible_room_ids = ARRAY[room_id]::uuid[]
-        WHERE visible_room_ids IS NULL OR cardinality(visible_room_ids)=0
-        """
-    )
-    op.execute(
-        "CREATE INDEX IF NOT EXISTS ix_messages_visible_room_ids_gin ON messages USING gin (visible_room_ids)"
-    )
+
+    # CONCURRENTLY keeps messages writable during the build; it can't run in a
+    # transaction, which the autocommit block provides
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_visible_room_ids_gin "
+            "ON messages USING gin (visible_room_ids)"
+        )
 
 
 def downgrade():
-    op.execute("DROP INDEX IF EXISTS ix_messages_visible_room_ids_gin")
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_visible_room_ids_gin")
     op.drop_column("messages", "visible_room_ids")
@@ -6,6 +6,7 @@ Create Date: 2026-03-25 00:00:00.000000
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -14,18 +15,24 @@ down_revision = "20260320_add_visible_room_ids_to_messages"
 branch_labels = None
 depends_on = None
 
+# The '{}'::jsonb defaults below only match a jsonb column; plain JSON elsewhere
+_JSONB = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+# uuid4 ids generated by Postgres, stored as native uuid; strings on the Python side
+_ID = postgresql.UUID(as_uuid=False)
+
 
 def upgrade():
     op.create_table(
         "agent_clients",
-        sa.Column("id", sa.String(), primary_key=True, nullable=False),
+        sa.Column("id", _ID, primary_key=True, nullable=False, server_default=sa.text("gen_random_uuid()")),
         sa.Column("org_id", sa.String(), sa.ForeignKey("organizations.id"), nullable=False),
         sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
         sa.Column("device_id", sa.String(), nullable=False),
         sa.Column("repo_id", sa.String(), nullable=False),
         sa.Column("branch", sa.String(), nullable=True),
         sa.Column("head_sha", sa.String(), nullable=True),
-        sa.Column("capabilities", sa.JSON(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("capabilities", _JSONB, nullable=False, server_default=sa.text("'{}'::jsonb")),
         sa.Column("last_seen_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.UniqueConstraint("user_id", "device_id", "repo_id", name="uq_agent_clients_user_device_repo"),
     )
@@ -37,13 +44,13 @@ def upgrade():
 
     op.create_table(
         "agent_inbox",
-        sa.Column("id", sa.String(), primary_key=True, nullable=False),
+        sa.Column("id", _ID, primary_key=True, nullable=False, server_default=sa.text("gen_random_uuid()")),
         sa.Column("org_id", sa.String(), sa.ForeignKey("organizations.id"), nullable=False),
         sa.Column("to_user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
         sa.Column("from_user_id", sa.String(), sa.ForeignKey("users.id"), nullable=True),
         sa.Column("repo_id", sa.String(), nullable=False),
         sa.Column("task_type", sa.String(), nullable=False),
-        sa.Column("payload", sa.JSON(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("payload", _JSONB, nullable=False, server_default=sa.text("'{}'::jsonb")),
         sa.Column("status", sa.String(), nullable=False, server_default="pending"),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
@@ -6,6 +6,9 @@ Create Date: 2026-03-26 00:00:00.000000
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migration_helpers import schema_snapshot
 
 
 # revision identifiers, used by Alembic.
@@ -16,12 +19,10 @@ depends_on = None
 
 
 def upgrade():
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
-    existing_cols = {col["name"] for col in inspector.get_columns("agent_inbox")}
+    existing_cols = schema_snapshot(sa.inspect(op.get_bind())).get("agent_inbox", set())
 
     if "result" not in existing_cols:
-        op.add_column("agent_inbox", sa.Column("result", sa.JSON(), nullable=True))
+        op.add_column("agent_inbox", sa.Column("result", sa.JSON().with_variant(postgresql.JSONB(), "postgresql"), nullable=True))
     if "error_code" not in existing_cols:
         op.add_column("agent_inbox", sa.Column("error_code", sa.String(), nullable=True))
 
@@ -0,0 +1,49 @@
+"""Set database defaults for vector index search
+
+Revision ID: 20260329_set_vector_search_gucs
+Revises: 20260328_merge_heads
+Create Date: 2026-03-29
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260329_set_vector_search_gucs"
+down_revision = "20260328_merge_heads"
+branch_labels = None
+depends_on = None
+
+# pgvector's defaults (probes = 1, ef_search = 40) trade too much recall away on
+# 1536-dim embeddings; probes ~ sqrt(lists) for the ivfflat indexes we build.
+SEARCH_SETTINGS = {
+    "ivfflat.probes": "10",
+    "hnsw.ef_search": "100",
+}
+
+
+def _has_vector_extension(bind) -> bool:
+    return bind.execute(sa.text("SELECT 1 FROM pg_extension WHERE extname = 'vector'")).first() is not None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _has_vector_extension(bind):
+        return
+
+    # Touch the vector type so pgvector's library (and its GUCs) is loaded in this
+    # session; ALTER DATABASE rejects unknown settings under a reserved prefix.
+    op.execute("SELECT '[1]'::vector")
+    for name, value in SEARCH_SETTINGS.items():
+        op.execute(
+            f"DO $$ BEGIN EXECUTE format('ALTER DATABASE %I SET {name} = {value}', current_database()); END $$"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for name in SEARCH_SETTINGS:
+        op.execute(f"DO $$ BEGIN EXECUTE format('ALTER DATABASE %I RESET {name}', current_database()); END $$")
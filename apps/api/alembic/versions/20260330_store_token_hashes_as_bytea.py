@@ -0,0 +1,54 @@
+"""Store OAuth/VS Code token hashes as raw SHA-256 bytes
+
+Revision ID: 20260330_store_token_hashes_as_bytea
+Revises: 20260329_set_vector_search_gucs
+Create Date: 2026-03-30
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260330_store_token_hashes_as_bytea"
+down_revision = "20260329_set_vector_search_gucs"
+branch_labels = None
+depends_on = None
+
+# SHA-256 digests stored as 64-char hex strings; bytea holds the same value in 32
+# bytes, halving these columns and their lookup indexes.
+HASH_COLUMNS = [
+    ("oauth_refresh_tokens", "token_hash"),
+    ("oauth_access_tokens", "token_hash"),
+    ("vscode_auth_codes", "code_hash"),
+]
+
+
+def _column_type(bind, table, column):
+    return bind.execute(
+        sa.text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for table, column in HASH_COLUMNS:
+        if _column_type(bind, table, column) not in (None, "bytea"):
+            # Rewrites the table and rebuilds its indexes on the column in one pass
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bytea USING decode({column}, 'hex')")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for table, column in HASH_COLUMNS:
+        if _column_type(bind, table, column) == "bytea":
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE varchar USING encode({column}, 'hex')")
@@ -0,0 +1,108 @@
+"""Build message and code-index embedding indexes after their data exists
+
+Revision ID: 20260331_build_embedding_indexes
+Revises: 20260330_store_token_hashes_as_bytea
+Create Date: 2026-03-31
+
+On databases created before 5310ca94e832 declared halfvec, messages.embedding is still
+vector(1536) and is converted here first. That ALTER rewrites the whole messages table
+under an ACCESS EXCLUSIVE lock, so every read and write of messages waits for it; on a
+large install, run this revision in a maintenance window. Newer databases already have
+halfvec and skip the rewrite.
+"""
+import logging
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_helpers import INDEX_MAINTENANCE_WORK_MEM, IVFFLAT_MIN_TRAINING_ROWS, ivfflat_lists
+
+# revision identifiers, used by Alembic.
+revision = "20260331_build_embedding_indexes"
+down_revision = "20260330_store_token_hashes_as_bytea"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Same switch as 20250312 and 20251222: HNSW unless ivfflat is asked for explicitly
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw").lower()
+
+# (index, table, column, type); these used to be created with a fixed lists = 100 in
+# the revisions that added the columns, i.e. trained on an empty or half-filled table.
+EMBEDDING_INDEXES = [
+    ("messages_embedding_idx", "messages", "embedding", "halfvec"),
+    ("code_index_entries_embedding_idx", "code_index_entries", "embedding", "vector"),
+]
+
+
+def _index_exists(bind, name) -> bool:
+    return bind.execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _column_type(bind, table, column):
+    return bind.execute(
+        sa.text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = CAST(:table AS regclass) AND attname = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def _supports_hnsw(bind) -> bool:
+    """HNSW arrived in pgvector 0.5.0."""
+    version = bind.execute(sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+    if not version:
+        return False
+    return tuple(int(part) for part in version.split(".")[:2]) >= (0, 5)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    hnsw_available = _supports_hnsw(bind)
+    use_hnsw = VECTOR_INDEX_TYPE != "ivfflat" and hnsw_available
+    with op.get_context().autocommit_block():
+        # Session-level: SET LOCAL would be a no-op outside a transaction
+        op.execute(f"SET maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'")
+        try:
+            for name, table, column, vector_type in EMBEDDING_INDEXES:
+                if vector_type == "halfvec" and _column_type(bind, table, column) == "vector(1536)":
+                    # 5310ca94e832 used to add messages.embedding as vector and f4d3b1d3fc88
+                    # then skipped the existing column, so every older install has vector;
+                    # the index has to be built on the new type, so convert first
+                    op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE halfvec(1536)")
+                if _index_exists(bind, name):
+                    continue
+                opclass = f"{vector_type}_cosine_ops"
+                hnsw = f"hnsw ({column} {opclass}) WITH (m = 16, ef_construction = 64)"
+                if use_hnsw:
+                    method = hnsw
+                else:
+                    rows = bind.execute(sa.text(f"SELECT count(*) FROM {table} WHERE {column} IS NOT NULL")).scalar() or 0
+                    if rows >= IVFFLAT_MIN_TRAINING_ROWS or not hnsw_available:
+                        # lists sized to the rows actually present rather than a fixed 100
+                        method = f"ivfflat ({column} {opclass}) WITH (lists = {ivfflat_lists(rows)})"
+                    else:
+                        # Too few vectors to train ivfflat centroids on; HNSW needs no training
+                        logger.warning("Only %d embeddings in %s; building %s as HNSW", rows, table, name)
+                        method = hnsw
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING {method}")
+        finally:
+            # The autocommit connection is the migration's own; don't leave the budget on it
+            op.execute("RESET maintenance_work_mem")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for name, _table, _column, _type in EMBEDDING_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,52 @@
+"""add per-user recency indexes for the admin collaboration views
+
+Revision ID: 20260401_add_collaboration_debug_indexes
+Revises: 20260331_build_embedding_indexes
+Create Date: 2026-04-01
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260401_add_collaboration_debug_indexes"
+down_revision = "20260331_build_embedding_indexes"
+branch_labels = None
+depends_on = None
+
+
+# The collaboration views read "these users' rows since <start>, newest first" from
+# each table. With only ix_*_user_id to go on, Postgres fetches every row a user ever
+# wrote and sorts; these let it range-scan each user's recent rows in order.
+# (name, table, columns, postgresql_where, sqlite_where)
+COLLABORATION_INDEXES = [
+    ("ix_messages_user_created", "messages", ["user_id", sa.text("created_at DESC")], None, None),
+    ("ix_notifications_user_created", "notifications", ["user_id", sa.text("created_at DESC")], None, None),
+    (
+        "ix_user_actions_user_timestamp_status",
+        "user_actions",
+        ["user_id", sa.text("timestamp DESC")],
+        sa.text("is_status_change"),
+        sa.text("is_status_change = 1"),
+    ),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, pg_where, sqlite_where in COLLABORATION_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=pg_where,
+                sqlite_where=sqlite_where,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _, _ in reversed(COLLABORATION_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
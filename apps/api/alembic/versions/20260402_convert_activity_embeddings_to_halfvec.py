@@ -0,0 +1,81 @@
+"""convert activity and status embeddings to halfvec on existing installs
+
+Revision ID: 20260402_convert_activity_embeddings_to_halfvec
+Revises: 20260401_add_collaboration_debug_indexes
+Create Date: 2026-04-02
+
+20251222 was changed to create user_actions.activity_embedding and
+user_status.status_embedding as halfvec(1536), but databases that had already run it
+kept vector(1536) columns and vector_cosine_ops indexes. This brings them in line.
+
+Each ALTER rewrites its table under an ACCESS EXCLUSIVE lock; reads and writes on
+user_actions/user_status wait until it finishes, so run it in a quiet window on large
+installs. Databases created after the 20251222 change skip the rewrite entirely.
+"""
+import logging
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_helpers import INDEX_MAINTENANCE_WORK_MEM
+
+# revision identifiers, used by Alembic.
+revision = "20260402_convert_activity_embeddings_to_halfvec"
+down_revision = "20260401_add_collaboration_debug_indexes"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Same graph parameters 20251222 builds these indexes with
+HNSW_M = int(os.getenv("ACTIVITY_HNSW_M", "24"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("ACTIVITY_HNSW_EF_CONSTRUCTION", "100"))
+
+# (index, table, column)
+ACTIVITY_EMBEDDING_INDEXES = [
+    ("idx_user_actions_embedding", "user_actions", "activity_embedding"),
+    ("idx_user_status_embedding", "user_status", "status_embedding"),
+]
+
+
+def _column_type(bind, table, column):
+    return bind.execute(
+        sa.text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = CAST(:table AS regclass) AND attname = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def _convert_to_halfvec(bind, name, table, column):
+    if _column_type(bind, table, column) != "vector(1536)":
+        return
+    logger.info("Converting %s.%s to halfvec(1536) and rebuilding %s", table, column, name)
+    # The old index uses vector_cosine_ops, which doesn't apply to the new type
+    op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE halfvec(1536)")
+    op.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+        f"USING hnsw ({column} halfvec_cosine_ops) WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(f"SET maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'")
+        try:
+            for name, table, column in ACTIVITY_EMBEDDING_INDEXES:
+                _convert_to_halfvec(bind, name, table, column)
+        finally:
+            op.execute("RESET maintenance_work_mem")
+
+
+def downgrade() -> None:
+    # halfvec is what 20251222 creates today, so there is no older schema to go back to
+    pass
@@ -0,0 +1,94 @@
+"""partition code_events and app_events on databases that have them as plain tables
+
+Revision ID: 20260403_partition_existing_event_tables
+Revises: 20260402_convert_activity_embeddings_to_halfvec
+Create Date: 2026-04-03
+
+20260108_add_code_events and 20260302_add_app_events create both tables
+range-partitioned by month, but databases that applied them before that change
+still have plain tables. Each one is rebuilt here as a partitioned table with the
+same columns, indexes and foreign keys, and partitions from its oldest row's month
+through 11 months ahead (plus DEFAULT). Tables that are already partitioned are
+left alone.
+
+The copy runs in the migration transaction and holds ACCESS EXCLUSIVE on the table
+until commit, so event ingestion waits for the whole rewrite; on a large install,
+run this revision in a maintenance window.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_helpers import create_month_partitions
+
+# revision identifiers, used by Alembic.
+revision = "20260403_partition_existing_event_tables"
+down_revision = "20260402_convert_activity_embeddings_to_halfvec"
+branch_labels = None
+depends_on = None
+
+EVENT_TABLES = ["code_events", "app_events"]
+
+
+def _relkind(bind, table):
+    return bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+
+
+def _partition(bind, table):
+    old = f"{table}_unpartitioned"
+    # Read everything to recreate before the rename; the primary key is re-added with
+    # the partition key in it, which Postgres requires
+    index_defs = bind.execute(
+        sa.text(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = CAST(:table AS regclass) AND NOT indisprimary"
+        ),
+        {"table": table},
+    ).scalars().all()
+    foreign_keys = bind.execute(
+        sa.text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+        ),
+        {"table": table},
+    ).all()
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {table}")).scalar()
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    today = date.today()
+    first = oldest.date() if oldest else today
+    months = (today.year - first.year) * 12 + today.month - first.month + 12
+    create_month_partitions(bind, table, months=months, today=first)
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    # Dropping the old table frees its index and constraint names for the new one
+    op.execute(f"DROP TABLE {old}")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+    for index_def in index_defs:
+        op.execute(index_def)
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for table in EVENT_TABLES:
+        # 'r' = plain table; 'p' means it was created partitioned already
+        if _relkind(bind, table) == "r":
+            _partition(bind, table)
+
+
+def downgrade() -> None:
+    # The tables' own revisions create them partitioned, so there is no plain layout
+    # to go back to; their downgrades drop them either way
+    pass
@@ -0,0 +1,52 @@
+"""replace single-column owner indexes with recency-ordered composites
+
+Revision ID: 20260404_add_recency_composite_indexes
+Revises: 20260403_partition_existing_event_tables
+Create Date: 2026-04-04
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260404_add_recency_composite_indexes"
+down_revision = "20260403_partition_existing_event_tables"
+branch_labels = None
+depends_on = None
+
+
+# Per-user/agent lists are read newest first; carrying the sort column lets the index
+# serve ORDER BY ... LIMIT without a separate sort. Each composite leads with the
+# column of the baseline index it replaces, so lookups on that column alone still use it.
+# (name, table, columns, replaced baseline index)
+RECENCY_INDEXES = [
+    ("ix_daily_briefs_user_date", "daily_briefs", ["user_id", sa.text("date DESC")], "ix_daily_briefs_user_id"),
+    ("ix_memories_agent_created", "memories", ["agent_id", sa.text("created_at DESC")], "ix_memories_agent_id"),
+    (
+        "ix_tasks_assignee_status_updated",
+        "tasks",
+        ["assignee_id", "status", sa.text("updated_at DESC")],
+        "ix_tasks_assignee_id",
+    ),
+    (
+        "ix_inbox_tasks_user_status_created",
+        "inbox_tasks",
+        ["user_id", "status", sa.text("created_at DESC")],
+        "ix_inbox_tasks_user_id",
+    ),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, replaced in RECENCY_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+            # Only after the composite is valid, so lookups always have an index to use
+            op.drop_index(replaced, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, replaced in reversed(RECENCY_INDEXES):
+            op.create_index(replaced, table, [columns[0]], if_not_exists=True, postgresql_concurrently=True)
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
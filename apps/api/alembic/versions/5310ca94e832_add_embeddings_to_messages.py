@@ -9,7 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 
 # revision identifiers, used by Alembic.
 revision: str = '5310ca94e832'
@@ -23,16 +23,14 @@ def upgrade():
     if bind.dialect.name == "postgresql":
         op.execute("CREATE EXTENSION IF NOT EXISTS vector")
 
-    # Add embedding column (1536 dimensions for OpenAI text-embedding-3-small)
+    # Add embedding column (1536 dimensions for OpenAI text-embedding-3-small),
+    # stored as halfvec like f4d3b1d3fc88 declares it
     op.add_column('messages', 
-        sa.Column('embedding', Vector(1536), nullable=True)
-    )
-    
-    # Add index for vector similarity search (CRITICAL for performance)
-    op.execute(
-        'CREATE INDEX IF NOT EXISTS messages_embedding_idx ON messages '
-        'USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);'
+        sa.Column('embedding', HALFVEC(1536), nullable=True)
     )
 
+    # messages_embedding_idx is built by 20260331_build_embedding_indexes, once the
+    # column has data to size and train the index on.
+
 def downgrade():
     op.drop_column('messages', 'embedding')
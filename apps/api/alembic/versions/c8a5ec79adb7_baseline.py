@@ -8,6 +8,8 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 
 # revision identifiers, used by Alembic.
@@ -16,6 +18,26 @@ down_revision: Union[str, Sequence[str], None] = None
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# (name, table, column), created once all tables exist
+BASELINE_INDEXES = [
+    ("ix_users_email", "users", "email"),
+    ("ix_users_org_id", "users", "org_id"),
+    ("ix_agents_user_id", "agents", "user_id"),
+    ("ix_rooms_org_id", "rooms", "org_id"),
+    ("ix_room_members_room_id", "room_members", "room_id"),
+    ("ix_room_members_user_id", "room_members", "user_id"),
+    ("ix_daily_briefs_user_id", "daily_briefs", "user_id"),
+    ("ix_daily_briefs_org_id", "daily_briefs", "org_id"),
+    ("ix_daily_briefs_date", "daily_briefs", "date"),
+    ("ix_messages_room_id", "messages", "room_id"),
+    ("ix_memories_agent_id", "memories", "agent_id"),
+    ("ix_memories_room_id", "memories", "room_id"),
+    ("ix_tasks_assignee_id", "tasks", "assignee_id"),
+    ("ix_tasks_status", "tasks", "status"),
+    ("ix_inbox_tasks_user_id", "inbox_tasks", "user_id"),
+    ("ix_inbox_tasks_room_id", "inbox_tasks", "room_id"),
+]
+
 
 def upgrade() -> None:
     """
@@ -26,7 +48,8 @@ def upgrade() -> None:
     """
     bind = op.get_bind()
     is_pg = bind.dialect.name == "postgresql"
-    json_type = sa.JSON()
+    # jsonb on Postgres: stored pre-parsed, so reads don't re-parse the text each time
+    json_type = postgresql.JSONB(astext_type=sa.Text()) if is_pg else sa.JSON()
 
     insp = sa.inspect(bind)
     if insp.has_table("alembic_version"):
@@ -38,48 +61,53 @@ def upgrade() -> None:
                 existing_nullable=False,
             )
 
-    op.create_table(
+    metadata = sa.MetaData()
+    now = sa.text("now()") if is_pg else None
+
+    sa.Table(
         "organizations",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("name", sa.String(), nullable=False),
         sa.Column("owner_user_id", sa.String(), nullable=True),
         sa.Column("invite_code", sa.String(), nullable=True, unique=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
 
-    op.create_table(
+    sa.Table(
         "users",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("email", sa.String(), nullable=False, unique=True),
         sa.Column("name", sa.String(), nullable=False),
         sa.Column("role", sa.String(), nullable=True),
         sa.Column("org_id", sa.String(), sa.ForeignKey("organizations.id"), nullable=True),
         sa.Column("preferences", json_type, nullable=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_users_email", "users", ["email"])
-    op.create_index("ix_users_org_id", "users", ["org_id"])
 
-    op.create_table(
+    sa.Table(
         "user_credentials",
+        metadata,
         sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), primary_key=True),
         sa.Column("password_hash", sa.String(), nullable=False),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
 
-    op.create_table(
+    sa.Table(
         "agents",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
         sa.Column("name", sa.String(), nullable=False),
         sa.Column("persona_json", json_type, nullable=True),
         sa.Column("persona_embedding", json_type, nullable=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_agents_user_id", "agents", ["user_id"])
 
-    op.create_table(
+    sa.Table(
         "rooms",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("org_id", sa.String(), sa.ForeignKey("organizations.id"), nullable=False),
         sa.Column("name", sa.String(), nullable=False),
@@ -87,74 +115,69 @@ def upgrade() -> None:
         sa.Column("memory_summary", sa.Text(), nullable=True),
         sa.Column("summary_version", sa.Integer(), nullable=True),
         sa.Column("summary_updated_at", sa.DateTime(timezone=True), nullable=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_rooms_org_id", "rooms", ["org_id"])
 
-    op.create_table(
+    sa.Table(
         "room_members",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("room_id", sa.String(), sa.ForeignKey("rooms.id"), nullable=False),
         sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
         sa.Column("role_in_room", sa.String(), nullable=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_room_members_room_id", "room_members", ["room_id"])
-    op.create_index("ix_room_members_user_id", "room_members", ["user_id"])
 
-    op.create_table(
+    sa.Table(
         "daily_briefs",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
         sa.Column("org_id", sa.String(), sa.ForeignKey("organizations.id"), nullable=True),
         sa.Column("date", sa.Date(), nullable=False),
         sa.Column("summary_json", json_type, nullable=False),
-        sa.Column("generated_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("generated_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_daily_briefs_user_id", "daily_briefs", ["user_id"])
-    op.create_index("ix_daily_briefs_org_id", "daily_briefs", ["org_id"])
-    op.create_index("ix_daily_briefs_date", "daily_briefs", ["date"])
 
-    op.create_table(
+    sa.Table(
         "messages",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("room_id", sa.String(), sa.ForeignKey("rooms.id"), nullable=False),
         sa.Column("sender_id", sa.String(), nullable=False),
         sa.Column("sender_name", sa.String(), nullable=False),
         sa.Column("role", sa.String(), nullable=False),
         sa.Column("content", sa.Text(), nullable=False),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_messages_room_id", "messages", ["room_id"])
 
-    op.create_table(
+    sa.Table(
         "memories",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("agent_id", sa.String(), sa.ForeignKey("agents.id"), nullable=False),
         sa.Column("room_id", sa.String(), sa.ForeignKey("rooms.id"), nullable=True),
         sa.Column("content", sa.Text(), nullable=False),
         sa.Column("importance_score", sa.Float(), nullable=True),
         sa.Column("embedding", json_type, nullable=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_memories_agent_id", "memories", ["agent_id"])
-    op.create_index("ix_memories_room_id", "memories", ["room_id"])
 
-    op.create_table(
+    sa.Table(
         "tasks",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("title", sa.String(), nullable=False),
         sa.Column("description", sa.Text(), nullable=True),
         sa.Column("assignee_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
         sa.Column("status", sa.String(), nullable=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
-        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_tasks_assignee_id", "tasks", ["assignee_id"])
-    op.create_index("ix_tasks_status", "tasks", ["status"])
 
-    op.create_table(
+    sa.Table(
         "inbox_tasks",
+        metadata,
         sa.Column("id", sa.String(), primary_key=True),
         sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
         sa.Column("content", sa.Text(), nullable=False),
@@ -163,10 +186,19 @@ def upgrade() -> None:
         sa.Column("status", sa.String(), nullable=True),
         sa.Column("priority", sa.String(), nullable=True),
         sa.Column("tags", json_type, nullable=True),
-        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()") if is_pg else None),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
     )
-    op.create_index("ix_inbox_tasks_user_id", "inbox_tasks", ["user_id"])
-    op.create_index("ix_inbox_tasks_room_id", "inbox_tasks", ["room_id"])
+
+    # Every index after every table, then the whole schema as one DDL batch on
+    # Postgres: one round-trip instead of one per statement. SQLite's driver only
+    # runs a single statement per execute, so it gets them one by one.
+    ddl = [CreateTable(table) for table in metadata.sorted_tables]
+    ddl += [CreateIndex(sa.Index(name, metadata.tables[table].c[column])) for name, table, column in BASELINE_INDEXES]
+    if is_pg:
+        op.execute(";\n".join(str(stmt.compile(dialect=bind.dialect)).strip() for stmt in ddl))
+    else:
+        for stmt in ddl:
+            op.execute(stmt)
 
 
 def downgrade() -> None:
@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -20,10 +21,13 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    op.add_column(
-        "users",
-        sa.Column("permissions", sa.JSON(), nullable=False, server_default="{}"),
-    )
+    if op.get_bind().dialect.name == "postgresql":
+        permissions = sa.Column(
+            "permissions", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")
+        )
+    else:
+        permissions = sa.Column("permissions", sa.JSON(), nullable=False, server_default="{}")
+    op.add_column("users", permissions)
 
 
 def downgrade() -> None:
@@ -9,7 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 
 # revision identifiers, used by Alembic.
 revision: str = 'f4d3b1d3fc88'
@@ -26,19 +26,16 @@ def upgrade():
     # Enable pgvector extension
     op.execute('CREATE EXTENSION IF NOT EXISTS vector')
     
-    # Add embedding column
+    # Add embedding column; halfvec (2 bytes/dim) halves what every similarity scan
+    # reads, at no measurable recall cost for 1536-dim OpenAI embeddings
     if "embedding" not in cols:
         op.add_column(
             "messages",
-            sa.Column("embedding", Vector(1536), nullable=True),
+            sa.Column("embedding", HALFVEC(1536), nullable=True),
         )
-    
-    # Create vector similarity index (CRITICAL for performance)
-    # This uses cosine similarity - perfect for OpenAI embeddings
-    op.execute(
-        'CREATE INDEX IF NOT EXISTS messages_embedding_idx ON messages '
-        'USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);'
-    )
+
+    # The cosine-similarity index (messages_embedding_idx) is built by
+    # 20260331_build_embedding_indexes, once there is data to train it on.
 
 def downgrade():
     op.execute('DROP INDEX IF EXISTS messages_embedding_idx')
@@ -1,9 +1,13 @@
 """Admin API endpoints."""
 
+import hashlib
+import importlib
+import json
 import logging
 import os
+from typing import Optional
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 
 from app.api.dependencies import require_platform_admin
 from models import User
@@ -13,6 +17,28 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Build metadata is fixed for the life of the process
+GIT_SHA = os.getenv("GIT_SHA") or "unknown"
+BUILD_TIME = os.getenv("BUILD_TIME") or "unknown"
+PARALLEL_ENV = os.getenv("PARALLEL_ENV") or "unknown"
+
+_VERSION_PAYLOAD = {
+    "git_sha": GIT_SHA,
+    "build_time": BUILD_TIME,
+    "env": PARALLEL_ENV,
+}
+_VERSION_ETAG = '"%s"' % hashlib.md5(json.dumps(_VERSION_PAYLOAD, sort_keys=True).encode()).hexdigest()
+_VERSION_CACHE_HEADERS = {"ETag": _VERSION_ETAG, "Cache-Control": "private, max-age=60"}
+
+
+def _input_debug(request: Request) -> Optional[dict]:
+    """Echo the query string into ``debug`` only when asked (``?debug=1``); the
+    dashboards poll these canaries and never read it."""
+    if not request.query_params.get("debug"):
+        return None
+    return {"input": {"query_params": dict(request.query_params)}}
+
+
 # === CANARY ENDPOINT FOR ADMIN DASHBOARD ===
 @router.get("/_ping")
 async def admin_ping(request: Request, current_user: User = Depends(require_platform_admin)):
@@ -38,7 +64,7 @@ async def admin_ping(request: Request, current_user: User = Depends(require_plat
             "email": current_user.email,
             "is_platform_admin": True,
         },
-        debug={"input": {"query_params": dict(request.query_params)}},
+        debug=_input_debug(request),
     )
 
 
@@ -49,191 +75,67 @@ async def admin_version(
 ):
     """
     Deployment verification endpoint to confirm build metadata.
-    """
-    git_sha = os.getenv("GIT_SHA") or "unknown"
-    build_time = os.getenv("BUILD_TIME") or "unknown"
-    parallel_env = os.getenv("PARALLEL_ENV") or "unknown"
-
-    data = {
-        "git_sha": git_sha,
-        "build_time": build_time,
-        "env": parallel_env,
-    }
-
-    return admin_ok(
-        request=request,
-        data=data,
-        debug={
-            "input": {"query_params": dict(request.query_params)},
-            "output": {
-                "has_git_sha": git_sha != "unknown",
-                "has_build_time": build_time != "unknown",
-                "has_env": parallel_env != "unknown",
-            },
-        },
-    )
-
 
-# Import timeline debug endpoints (admin/timeline.py)
-try:
-    from . import timeline as timeline_router
-
-    logger.info("[Admin API] ✅ Successfully imported timeline router")
-
-    # Include timeline router WITHOUT /timeline prefix to match frontend expectations
-    # Frontend calls: /api/admin/timeline-debug/{email}
-    # So we include it directly under /admin (no nested prefix)
-    router.include_router(
-        timeline_router.router,
-        tags=["admin-timeline-debug"],
-    )
-    logger.info("[Admin API] ✅ Timeline router registered - endpoints available at /admin/timeline-debug/...")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin timeline router: {exc}", exc_info=True)
+    The payload only changes on redeploy, so it carries a strong ETag and a
+    conditional request with a matching If-None-Match gets an empty 304.
+    ``?debug=1`` responses are sent without validator or caching headers.
+    """
+    debug = _input_debug(request)
+    if debug is None:
+        if_none_match = request.headers.get("if-none-match", "")
+        if _VERSION_ETAG in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=_VERSION_CACHE_HEADERS)
+    else:
+        debug["output"] = {
+            "has_git_sha": GIT_SHA != "unknown",
+            "has_build_time": BUILD_TIME != "unknown",
+            "has_env": PARALLEL_ENV != "unknown",
+        }
+
+    response = admin_ok(request=request, data=_VERSION_PAYLOAD, debug=debug)
+    # The ?debug=1 body differs (it echoes the query), so it must not share the validator
+    if debug is None:
+        response.headers.update(_VERSION_CACHE_HEADERS)
+    return response
+
+
+# Sub-routers included under /admin, in registration order: (module, openapi tag).
+# They are mounted without a nested prefix because the frontend calls e.g.
+# /api/admin/timeline-debug/{email} and /api/admin/system-overview directly.
+ADMIN_ROUTERS = [
+    ("timeline", "admin-timeline-debug"),
+    ("vscode", "admin-vscode-debug"),
+    ("collaboration", "admin-collaboration-debug"),
+    ("waitlist", "admin-waitlist"),
+    ("shared", "admin-shared"),
+    ("system", "admin-system"),
+    ("settings", "admin-settings"),
+    ("events", "admin-events"),
+    ("diagnostics", "admin-diagnostics"),
+    ("debug_headers", "admin-debug"),
+    ("selftest", "admin-system"),
+]
+
+# include_router copies routes, so listing a module twice would leave duplicate
+# entries that every request scans past.
+assert len({name for name, _ in ADMIN_ROUTERS}) == len(ADMIN_ROUTERS), "duplicate module in ADMIN_ROUTERS"
+
+for module_name, tag in ADMIN_ROUTERS:
+    # Best-effort: one broken admin module shouldn't take the rest of /admin down
     try:
-        from app.services import log_buffer
-
-        log_buffer.log_event(
-            "error",
-            "admin",
-            "Failed to import admin timeline router",
-            {"error": str(exc)},
-        )
-    except Exception:
-        pass
-
-# Import VSCode debug endpoints (admin/vscode.py)
-try:
-    from . import vscode as vscode_router
-
-    logger.info("[Admin API] ✅ Successfully imported VSCode router")
-
-    # Include VSCode router
-    # Frontend calls: /api/admin/vscode-debug/{email}
-    router.include_router(
-        vscode_router.router,
-        tags=["admin-vscode-debug"],
-    )
-    logger.info("[Admin API] ✅ VSCode router registered - endpoints available at /admin/vscode-debug/...")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin VSCode router: {exc}", exc_info=True)
-
-# Import Collaboration debug endpoints (admin/collaboration.py)
-try:
-    from . import collaboration as collaboration_router
-
-    logger.info("[Admin API] ✅ Successfully imported Collaboration router")
-
-    # Include Collaboration router
-    # Frontend calls: /api/admin/collaboration-debug?users=...
-    router.include_router(
-        collaboration_router.router,
-        tags=["admin-collaboration-debug"],
-    )
-    logger.info("[Admin API] ✅ Collaboration router registered - endpoints available at /admin/collaboration-debug")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin Collaboration router: {exc}", exc_info=True)
-
-# Import Waitlist admin endpoints
-try:
-    from . import waitlist as waitlist_router
-
-    router.include_router(waitlist_router.router, tags=["admin-waitlist"])
-    logger.info("[Admin API] ✅ Waitlist router registered - endpoints available at /admin/waitlist")
-except Exception as exc:  # pragma: no cover
-    logger.error(f"[Admin API] ❌ Could not import admin Waitlist router: {exc}", exc_info=True)
-
-# Import shared endpoints (users, shared auth helper)
-try:
-    from . import shared as shared_router
-
-    logger.info("[Admin API] ✅ Successfully imported Shared admin router")
-
-    router.include_router(
-        shared_router.router,
-        tags=["admin-shared"],
-    )
-    logger.info("[Admin API] ✅ Shared router registered - endpoints available at /admin/users")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin Shared router: {exc}", exc_info=True)
-
-# Import System overview endpoints (admin/system.py)
-try:
-    from . import system as system_router
-
-    logger.info("[Admin API] ✅ Successfully imported System router")
-
-    # Include System router
-    # Frontend calls: /api/admin/system-overview?days=7
-    router.include_router(
-        system_router.router,
-        tags=["admin-system"],
-    )
-    logger.info("[Admin API] ✅ System router registered - endpoints available at /admin/system-overview")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin System router: {exc}", exc_info=True)
-
-# Import Admin settings/logs endpoints
-try:
-    from . import settings as settings_router
-
-    logger.info("[Admin API] ✅ Successfully imported Settings router")
-
-    router.include_router(
-        settings_router.router,
-        tags=["admin-settings"],
-    )
-    logger.info("[Admin API] ✅ Settings router registered - endpoints available at /admin/settings and /admin/logs")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin Settings router: {exc}", exc_info=True)
-
-# Import Admin events endpoint
-try:
-    from . import events as events_router
-
-    logger.info("[Admin API] ✅ Successfully imported Events router")
-
-    router.include_router(
-        events_router.router,
-        tags=["admin-events"],
-    )
-    logger.info("[Admin API] ✅ Events router registered - endpoints available at /admin/events")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin Events router: {exc}", exc_info=True)
-
-# Import diagnostics (_routes, _health)
-try:
-    from . import diagnostics as diagnostics_router
-
-    logger.info("[Admin API] ✅ Successfully imported Diagnostics router")
-
-    router.include_router(
-        diagnostics_router.router,
-        tags=["admin-diagnostics"],
-    )
-    logger.info("[Admin API] ✅ Diagnostics router registered - endpoints available at /admin/_routes and /admin/_health")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin Diagnostics router: {exc}", exc_info=True)
-
-# Import debug headers endpoint
-try:
-    from . import debug_headers as debug_headers_router
-
-    router.include_router(debug_headers_router.router, tags=["admin-debug"])
-    logger.info("[Admin API] ✅ Debug headers router registered - endpoint /admin/_debug_headers")
-except Exception as exc:  # pragma: no cover
-    logger.error(f"[Admin API] ❌ Could not import admin debug headers router: {exc}", exc_info=True)
-
-# Import selftest endpoints (_selftest, _health, _routes)
-try:
-    from . import selftest as selftest_router
-
-    logger.info("[Admin API] ✅ Successfully imported Selftest router")
-
-    router.include_router(
-        selftest_router.router,
-        tags=["admin-system"],
-    )
-    logger.info("[Admin API] ✅ Selftest router registered - endpoints available at /admin/_selftest, /admin/_health, /admin/_routes")
-except Exception as exc:  # pragma: no cover - best-effort import
-    logger.error(f"[Admin API] ❌ Could not import admin Selftest router: {exc}", exc_info=True)
+        module = importlib.import_module(f".{module_name}", __name__)
+        router.include_router(module.router, tags=[tag])
+        logger.info("[Admin API] ✅ %s router registered", module_name)
+    except Exception as exc:  # pragma: no cover - best-effort import
+        logger.error("[Admin API] ❌ Could not import admin %s router: %s", module_name, exc, exc_info=True)
+        try:
+            from app.services import log_buffer
+
+            log_buffer.log_event(
+                "error",
+                "admin",
+                f"Failed to import admin {module_name} router",
+                {"error": str(exc)},
+            )
+        except Exception:
+            pass
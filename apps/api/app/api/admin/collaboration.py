@@ -2,16 +2,21 @@
 Admin Collaboration Debug API Endpoints
 Provides collaboration and notification monitoring for platform admins.
 """
+import asyncio
 from fastapi import APIRouter, Depends, Query, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import String, func, or_, any_, bindparam, select
+from sqlalchemy.dialects import postgresql
 import hashlib
+import itertools
 from database import get_db
 from models import User, Message, Notification, ChatInstance, UserAction, CollaborationSignal, CollaborationAuditRun
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from typing import List, Optional
 import json
 import logging
+import time
 import uuid
 from pydantic import BaseModel
 
@@ -22,15 +27,140 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Dashboards re-poll /collaboration-debug with the same selection; repeats within
+# the TTL are served from this process instead of re-running every query.
+COLLAB_DEBUG_CACHE_TTL_SECONDS = 90
+COLLAB_DEBUG_CACHE_MAX_ENTRIES = 128
+_collab_debug_cache: dict = {}
+
+# /collaboration-debug runs its three reads on pooled connections of their own; this
+# caps how many of those are checked out at once across all requests, so a burst of
+# dashboard polls can't take the whole pool (10 + 10 overflow) from other endpoints.
+COLLAB_DEBUG_MAX_CONCURRENT_READS = 4
+_collab_debug_read_slots = asyncio.Semaphore(COLLAB_DEBUG_MAX_CONCURRENT_READS)
+
+# Rows per bulk INSERT when an audit run persists its signals
+SIGNAL_INSERT_BATCH_SIZE = 500
+
+
+_JSON_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
 
 def _safe_json(value):
-    if isinstance(value, dict):
+    # Exact-type checks first: almost every node is a plain scalar, dict or list,
+    # and those skip the isinstance chain and the sanitize_for_json call.
+    value_type = type(value)
+    if value_type in _JSON_SCALAR_TYPES:
+        return value
+    if value_type is dict or isinstance(value, dict):
         return {k: _safe_json(v) for k, v in value.items()}
-    if isinstance(value, list):
+    if value_type is list or isinstance(value, list):
         return [_safe_json(v) for v in value]
     return sanitize_for_json(value)
 
 
+def _email_in(db: Session, emails):
+    """``User.email IN emails``. On Postgres the list is bound as a single array
+    parameter (``email = ANY(:emails)``), so the statement is the same however many
+    emails are passed instead of growing one placeholder per email."""
+    if db.get_bind().dialect.name == "postgresql":
+        return User.email == any_(bindparam("emails", list(emails), type_=postgresql.ARRAY(String)))
+    return User.email.in_(emails)
+
+
+# The per-user reads behind /collaboration-debug, built once at import: only the
+# bound values differ between requests, so each execution is a lookup in
+# SQLAlchemy's compiled-statement cache rather than a fresh query build.
+_debug_last_activity = func.max(Message.created_at).label("last_activity")
+_DEBUG_MESSAGE_ACTIVITY_STMT = (
+    select(
+        Message.chat_instance_id,
+        Message.room_id,
+        Message.user_id,
+        func.count(Message.id).label("message_count"),
+        func.min(Message.created_at).label("first_activity"),
+        _debug_last_activity,
+    )
+    .where(
+        Message.user_id.in_(bindparam("user_ids", expanding=True)),
+        Message.created_at >= bindparam("start_dt"),
+    )
+    .group_by(Message.chat_instance_id, Message.room_id, Message.user_id)
+    .order_by(_debug_last_activity.desc())
+)
+_DEBUG_NOTIFICATIONS_STMT = (
+    select(Notification)
+    .where(
+        Notification.user_id.in_(bindparam("user_ids", expanding=True)),
+        Notification.created_at >= bindparam("start_dt"),
+    )
+    .order_by(Notification.created_at.desc())
+)
+# Recent UserActions with summaries/embeddings
+_DEBUG_USER_ACTIONS_STMT = (
+    select(UserAction)
+    .where(
+        UserAction.user_id.in_(bindparam("user_ids", expanding=True)),
+        UserAction.timestamp >= bindparam("start_dt"),
+        UserAction.is_status_change == True,
+    )
+    .order_by(UserAction.timestamp.desc())
+    .limit(100)
+)
+
+
+def _fetch_debug_message_activity(db: Session, user_ids, start_dt):
+    """Per-(chat, room, user) message counts and first/last timestamps, most recently
+    active first; aggregated in the database so no Message rows are loaded."""
+    return db.execute(_DEBUG_MESSAGE_ACTIVITY_STMT, {"user_ids": user_ids, "start_dt": start_dt}).all()
+
+
+def _fetch_debug_notifications(db: Session, user_ids, start_dt):
+    return db.execute(_DEBUG_NOTIFICATIONS_STMT, {"user_ids": user_ids, "start_dt": start_dt}).scalars().all()
+
+
+def _fetch_debug_user_actions(db: Session, user_ids, start_dt):
+    return db.execute(_DEBUG_USER_ACTIONS_STMT, {"user_ids": user_ids, "start_dt": start_dt}).scalars().all()
+
+
+# Same options as database.SessionLocal, but bound per call to the request session's
+# engine, so the reads follow whatever get_db provides (including test overrides).
+_DebugReadSession = sessionmaker(autoflush=False, autocommit=False, future=True)
+
+
+def _in_own_session(bind, fetch, *args):
+    """Run ``fetch`` on a short-lived session of its own so it can overlap with
+    other reads; the returned rows are detached but fully loaded."""
+    session = _DebugReadSession(bind=bind)
+    try:
+        return fetch(session, *args)
+    finally:
+        session.close()
+
+
+async def _read_in_own_session(bind, fetch, *args):
+    async with _collab_debug_read_slots:
+        return await asyncio.to_thread(_in_own_session, bind, fetch, *args)
+
+
+def _get_cached_collab_debug(key):
+    entry = _collab_debug_cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] >= COLLAB_DEBUG_CACHE_TTL_SECONDS:
+        _collab_debug_cache.pop(key, None)
+        return None
+    return entry
+
+
+def _store_collab_debug(key, data, debug):
+    _collab_debug_cache.pop(key, None)
+    while len(_collab_debug_cache) >= COLLAB_DEBUG_CACHE_MAX_ENTRIES:
+        # dicts keep insertion order, so the first key is the oldest entry
+        _collab_debug_cache.pop(next(iter(_collab_debug_cache)))
+    _collab_debug_cache[key] = (time.monotonic(), data, debug)
+
+
 def build_interaction_graph(users, chats, notifications, conflicts):
     """Build interaction graph nodes and edges."""
     logger.debug(f"[Collab Debug] Building interaction graph for {len(users)} users")
@@ -38,48 +168,38 @@ def build_interaction_graph(users, chats, notifications, conflicts):
     nodes = []
     edges = []
 
-    # Create nodes (one per user)
-    for user in users:
-        # Count total activity for this user
-        activity_count = 0
+    # One pass over notifications for every user's activity count (a notification
+    # a user sent to themselves still counts once)
+    activity_counts = Counter()
+    # Track interaction counts between pairs
+    user_pairs = defaultdict(lambda: {"chat": 0, "notification": 0, "conflict": 0})
 
-        # Count from notifications
-        activity_count += len([n for n in notifications if n["to_user"] == user.email or n.get("from_user") == user.email])
+    for notif in notifications:
+        to_user, from_user = notif["to_user"], notif.get("from_user")
+        activity_counts[to_user] += 1
+        if from_user and from_user != to_user:
+            activity_counts[from_user] += 1
+        # Edges from notifications
+        if from_user and to_user:
+            user_pairs[tuple(sorted((from_user, to_user)))]["notification"] += 1
 
+    # Create nodes (one per user)
+    for user in users:
         nodes.append({
             "id": user.email,
             "label": user.name or user.email,
-            "activity_count": activity_count
+            "activity_count": activity_counts[user.email]
         })
 
-    # Create edges (interactions between users)
-    user_pairs = {}  # Track interaction counts between pairs
-
     # Edges from chats
     for chat in chats:
-        participants = chat["participants"]
-        for i, user1 in enumerate(participants):
-            for user2 in participants[i+1:]:
-                pair_key = tuple(sorted([user1, user2]))
-                if pair_key not in user_pairs:
-                    user_pairs[pair_key] = {"chat": 0, "notification": 0, "conflict": 0}
-                user_pairs[pair_key]["chat"] += chat["message_count"]
-
-    # Edges from notifications
-    for notif in notifications:
-        if notif.get("from_user") and notif.get("to_user"):
-            pair_key = tuple(sorted([notif["from_user"], notif["to_user"]]))
-            if pair_key not in user_pairs:
-                user_pairs[pair_key] = {"chat": 0, "notification": 0, "conflict": 0}
-            user_pairs[pair_key]["notification"] += 1
+        for user1, user2 in itertools.combinations(chat["participants"], 2):
+            user_pairs[tuple(sorted((user1, user2)))]["chat"] += chat["message_count"]
 
     # Edges from conflicts
     for conflict in conflicts:
         if len(conflict["users"]) >= 2:
-            pair_key = tuple(sorted(conflict["users"][:2]))
-            if pair_key not in user_pairs:
-                user_pairs[pair_key] = {"chat": 0, "notification": 0, "conflict": 0}
-            user_pairs[pair_key]["conflict"] += 1
+            user_pairs[tuple(sorted(conflict["users"][:2]))]["conflict"] += 1
 
     # Build edge list
     for (user1, user2), counts in user_pairs.items():
@@ -111,6 +231,7 @@ def build_interaction_graph(users, chats, notifications, conflicts):
 
 @router.get("/collaboration/messages")
 async def get_collab_messages(
+    request: Request,
     user_email: str = Query(...),
     limit: int = Query(20, ge=1, le=200),
     db: Session = Depends(get_db),
@@ -173,6 +294,7 @@ class BatchMessagesPayload(BaseModel):
 
 @router.post("/collaboration/messages/batch")
 async def get_collab_messages_batch(
+    request: Request,
     payload: BatchMessagesPayload,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_platform_admin),
@@ -180,19 +302,40 @@ async def get_collab_messages_batch(
     request_id = str(uuid.uuid4())
     try:
         limit = max(1, min(payload.limit, 200))
-        results = {}
-        for email in payload.user_emails:
-            user = db.query(User).filter(User.email == email).first()
-            if not user:
-                results[email] = {"messages": [], "error": "User not found"}
-                continue
+        user_ids_by_email = {
+            u.email: u.id
+            for u in db.query(User).filter(_email_in(db, payload.user_emails)).all()
+        }
+
+        # Newest `limit` messages per user in one query instead of one per email
+        messages_by_user = {}
+        if user_ids_by_email:
+            ranked = (
+                db.query(
+                    Message.id.label("message_id"),
+                    func.row_number()
+                    .over(partition_by=Message.user_id, order_by=Message.created_at.desc())
+                    .label("rn"),
+                )
+                .filter(Message.user_id.in_(list(user_ids_by_email.values())))
+                .subquery()
+            )
             messages = (
                 db.query(Message)
-                .filter(Message.user_id == user.id)
-                .order_by(Message.created_at.desc())
-                .limit(limit)
+                .join(ranked, Message.id == ranked.c.message_id)
+                .filter(ranked.c.rn <= limit)
+                .order_by(Message.user_id, Message.created_at.desc())
                 .all()
             )
+            for m in messages:
+                messages_by_user.setdefault(m.user_id, []).append(m)
+
+        results = {}
+        for email in payload.user_emails:
+            user_id = user_ids_by_email.get(email)
+            if user_id is None:
+                results[email] = {"messages": [], "error": "User not found"}
+                continue
             results[email] = [
                 {
                     "id": m.id,
@@ -201,7 +344,7 @@ async def get_collab_messages_batch(
                     "content": m.content,
                     "thread_id": m.chat_instance_id,
                 }
-                for m in messages
+                for m in messages_by_user.get(user_id, [])
             ]
         return admin_ok(
             request=request,
@@ -267,9 +410,26 @@ async def get_collaboration_debug(
             status_code=400,
         )
 
+    cache_key = (tuple(sorted(users)), days)
+    cached = _get_cached_collab_debug(cache_key)
+    if cached is not None:
+        cached_at, data, debug = cached
+        logger.info("[Collab Debug] ✅ Serving cached collaboration debug data")
+        return admin_ok(
+            request=request,
+            data=data,
+            debug={
+                **debug,
+                "input": {**debug["input"], "query_params": dict(request.query_params)},
+                "cache": {"hit": True, "age_seconds": round(time.monotonic() - cached_at, 1)},
+            },
+        )
+
     # STEP 3: Find users
     logger.debug(f"[Collab Debug] Querying {len(users)} users...")
-    user_objects = db.query(User).filter(User.email.in_(users)).all()
+    # Only the columns used below (the graph labels nodes with name); plain rows
+    # instead of full User instances
+    user_objects = db.query(User.id, User.email, User.name).filter(_email_in(db, users)).all()
     if len(user_objects) != len(users):
         found_emails = [u.email for u in user_objects]
         missing = set(users) - set(found_emails)
@@ -292,46 +452,50 @@ async def get_collaboration_debug(
     start_dt = end_dt - timedelta(days=days)
     logger.info(f"[Collab Debug] Date range: {start_dt.date()} to {end_dt.date()} ({days} days)")
 
-    # STEP 5: Get chat interactions between selected users (all interactions, no multi-user requirement)
-    logger.debug(f"[Collab Debug] Querying chat interactions/messages...")
-    messages = (
-        db.query(Message)
-        .filter(
-            and_(
-                Message.user_id.in_(user_ids),
-                Message.created_at >= start_dt,
-            )
-        )
-        .order_by(Message.created_at.desc())
-        .all()
+    # Messages, notifications and user actions only depend on user_ids, so they are
+    # read concurrently, each on its own connection from the pool. The user lookup
+    # was the request session's last query; ending its transaction hands its
+    # connection back first, so this request holds at most the reads' connections.
+    logger.debug(f"[Collab Debug] Querying messages, notifications and user actions...")
+    bind = db.get_bind()
+    db.rollback()
+    message_activity, notifications, user_actions = await asyncio.gather(
+        _read_in_own_session(bind, _fetch_debug_message_activity, user_ids, start_dt),
+        _read_in_own_session(bind, _fetch_debug_notifications, user_ids, start_dt),
+        _read_in_own_session(bind, _fetch_debug_user_actions, user_ids, start_dt),
     )
 
+    # STEP 5: Get chat interactions between selected users (all interactions, no multi-user requirement)
+    # At most 4 users, so each chat's participants are tracked as a bitmask; bits
+    # follow email order, so expanding a mask yields the emails already sorted.
+    emails_by_bit = sorted(user_map.values())
+    user_bits = {uid: 1 << emails_by_bit.index(email) for uid, email in user_map.items()}
     chat_groups = {}
-    for msg in messages:
-        cid = msg.chat_instance_id or msg.room_id or "unknown"
+    for row in message_activity:
+        cid = row.chat_instance_id or row.room_id or "unknown"
         grp = chat_groups.setdefault(
             cid,
             {
                 "chat_id": cid,
-                "participants": set(),
+                "participant_mask": 0,
                 "message_count": 0,
                 "last_activity": None,
                 "first_activity": None,
             },
         )
-        grp["participants"].add(user_map.get(msg.user_id, str(msg.user_id)))
-        grp["message_count"] += 1
-        ts = msg.created_at
-        if ts:
-            if grp["last_activity"] is None or ts > grp["last_activity"]:
-                grp["last_activity"] = ts
-            if grp["first_activity"] is None or ts < grp["first_activity"]:
-                grp["first_activity"] = ts
+        grp["participant_mask"] |= user_bits[row.user_id]
+        grp["message_count"] += row.message_count
+        if row.last_activity and (grp["last_activity"] is None or row.last_activity > grp["last_activity"]):
+            grp["last_activity"] = row.last_activity
+        if row.first_activity and (grp["first_activity"] is None or row.first_activity < grp["first_activity"]):
+            grp["first_activity"] = row.first_activity
 
     chat_interactions = [
         {
             "chat_id": cid,
-            "participants": sorted(list(data["participants"])),
+            "participants": [
+                email for bit, email in enumerate(emails_by_bit) if data["participant_mask"] >> bit & 1
+            ],
             "message_count": data["message_count"],
             "last_activity": data["last_activity"].isoformat() if data["last_activity"] else None,
             "first_activity": data["first_activity"].isoformat() if data["first_activity"] else None,
@@ -342,13 +506,7 @@ async def get_collaboration_debug(
     logger.info(f"[Collab Debug] Found {len(chat_interactions)} chat interactions (all involving selected users)")
 
     # STEP 6: Get notifications between users
-    logger.debug(f"[Collab Debug] Querying notifications...")
-    notifications = db.query(Notification).filter(
-        and_(
-            Notification.user_id.in_(user_ids),
-            Notification.created_at >= start_dt
-        )
-    ).order_by(Notification.created_at.desc()).all()
+    notif_by_id = {n.id: n for n in notifications}
 
     logger.info(f"[Collab Debug] Found {len(notifications)} notifications")
 
@@ -383,7 +541,7 @@ async def get_collaboration_debug(
 
     for notif in conflict_notifs:
         # Find the actual notification object to get data
-        notif_obj = next((n for n in notifications if n.id == notif["id"]), None)
+        notif_obj = notif_by_id.get(notif["id"])
         if not notif_obj:
             continue
 
@@ -413,80 +571,48 @@ async def get_collaboration_debug(
     logger.debug(f"[Collab Debug] Finding collaboration opportunities...")
     collaboration_opportunities = []
 
-    # Get recent UserActions with summaries/embeddings
-    user_actions = db.query(UserAction).filter(
-        and_(
-            UserAction.user_id.in_(user_ids),
-            UserAction.timestamp >= start_dt,
-            UserAction.is_status_change == True
-        )
-    ).order_by(UserAction.timestamp.desc()).limit(100).all()
-
     logger.debug(f"[Collab Debug] Found {len(user_actions)} user actions")
 
-    # Group by user
-    actions_by_user = {}
+    # Parse each action once and collect the files every user touched
+    files_by_user = {}
     for action in user_actions:
-        if action.user_id not in actions_by_user:
-            actions_by_user[action.user_id] = []
-        actions_by_user[action.user_id].append(action)
+        data = action.action_data
+        if data and not isinstance(data, dict):
+            try:
+                data = json.loads(data)
+            except Exception:
+                data = None
+        files = files_by_user.setdefault(action.user_id, set())
+        if data and isinstance(data, dict):
+            if 'file_path' in data:
+                files.add(data['file_path'])
+            if 'files' in data and isinstance(data['files'], list):
+                files.update(data['files'])
+
+    detected_at = end_dt.isoformat()
 
     # Simple heuristic: find users working on similar files/projects
-    for user_id_1 in user_ids:
-        for user_id_2 in user_ids:
-            if user_id_1 >= user_id_2:  # Avoid duplicates
-                continue
-
-            actions_1 = actions_by_user.get(user_id_1, [])
-            actions_2 = actions_by_user.get(user_id_2, [])
-
-            # Find common files/projects
-            files_1 = set()
-            files_2 = set()
-
-            for action in actions_1:
-                data = action.action_data
-                if data and not isinstance(data, dict):
-                    try:
-                        data = json.loads(data)
-                    except Exception:
-                        data = None
-                if data and isinstance(data, dict):
-                    if 'file_path' in data:
-                        files_1.add(data['file_path'])
-                    if 'files' in data and isinstance(data['files'], list):
-                        files_1.update(data['files'])
-
-            for action in actions_2:
-                data = action.action_data
-                if data and not isinstance(data, dict):
-                    try:
-                        data = json.loads(data)
-                    except Exception:
-                        data = None
-                if data and isinstance(data, dict):
-                    if 'file_path' in data:
-                        files_2.add(data['file_path'])
-                    if 'files' in data and isinstance(data['files'], list):
-                        files_2.update(data['files'])
-
-            common_files = files_1.intersection(files_2)
-
-            if common_files:
-                similarity_score = len(common_files) / max(len(files_1), len(files_2), 1)
-                logger.debug(f"[Collab Debug] Collaboration opportunity: {user_map[user_id_1]} & {user_map[user_id_2]} - {len(common_files)} common files")
-
-                collaboration_opportunities.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "type": "common_files",
-                    "similarity_score": similarity_score,
-                    "user1": user_map[user_id_1],
-                    "user2": user_map[user_id_2],
-                    "user1_activity": f"Working on {len(files_1)} files",
-                    "user2_activity": f"Working on {len(files_2)} files",
-                    "suggestion": f"Both working on: {', '.join(list(common_files)[:3])}",
-                    "common_files": list(common_files)
-                })
+    # (sorted so user1 < user2 in every pair)
+    for user_id_1, user_id_2 in itertools.combinations(sorted(user_ids), 2):
+        files_1 = files_by_user.get(user_id_1, set())
+        files_2 = files_by_user.get(user_id_2, set())
+        common_files = files_1.intersection(files_2)
+
+        if common_files:
+            similarity_score = len(common_files) / max(len(files_1), len(files_2), 1)
+            logger.debug(f"[Collab Debug] Collaboration opportunity: {user_map[user_id_1]} & {user_map[user_id_2]} - {len(common_files)} common files")
+
+            collaboration_opportunities.append({
+                "timestamp": detected_at,
+                "type": "common_files",
+                "similarity_score": similarity_score,
+                "user1": user_map[user_id_1],
+                "user2": user_map[user_id_2],
+                "user1_activity": f"Working on {len(files_1)} files",
+                "user2_activity": f"Working on {len(files_2)} files",
+                "suggestion": f"Both working on: {', '.join(list(common_files)[:3])}",
+                "common_files": list(common_files)
+            })
 
     logger.info(f"[Collab Debug] Found {len(collaboration_opportunities)} collaboration opportunities")
 
@@ -499,6 +625,8 @@ async def get_collaboration_debug(
         conflicts_detected
     )
 
+    total_messages = sum(row.message_count for row in message_activity)
+
     # STEP 10: Build response
     response = {
         "users": users,
@@ -514,7 +642,7 @@ async def get_collaboration_debug(
         "interaction_graph": interaction_graph,
         "summary": {
             "total_chats": len(chat_interactions),
-            "total_messages": sum([c["message_count"] for c in chat_interactions]),
+            "total_messages": total_messages,
             "total_notifications": len(notification_list),
             "total_conflicts": len(conflicts_detected),
             "total_opportunities": len(collaboration_opportunities)
@@ -523,33 +651,31 @@ async def get_collaboration_debug(
 
     logger.info(f"[Collab Debug] ✅ Returning collaboration debug data: {response['summary']}")
     try:
-        return admin_ok(
-            request=request,
-            data=_safe_json(response),
-            debug={
-                "input": {
-                    "query_params": dict(request.query_params),
-                    "users_received": list(users),
-                    "users_resolved": len(user_objects),
-                    "user_ids": user_ids,
-                    "cutoff_timestamp": start_dt.isoformat(),
-                },
-                "output": response.get("summary", {}),
-                "db": {
-                    "tables_queried": [
-                        "users",
-                        "messages",
-                        "notifications",
-                        "chat_instances",
-                        "user_actions",
-                    ]
-                },
-                "diagnostic": {
-                    "messages_found_count": len(messages),
-                    "chats_found_count": len(chat_interactions),
-                }
+        data = _safe_json(response)
+        debug = {
+            "input": {
+                "query_params": dict(request.query_params),
+                "users_received": list(users),
+                "users_resolved": len(user_objects),
+                "user_ids": user_ids,
+                "cutoff_timestamp": start_dt.isoformat(),
             },
-        )
+            "output": response.get("summary", {}),
+            "db": {
+                "tables_queried": [
+                    "users",
+                    "messages",
+                    "notifications",
+                    "user_actions",
+                ]
+            },
+            "diagnostic": {
+                "messages_found_count": total_messages,
+                "chats_found_count": len(chat_interactions),
+            }
+        }
+        _store_collab_debug(cache_key, data, debug)
+        return admin_ok(request=request, data=data, debug={**debug, "cache": {"hit": False}})
     except Exception as exc:
         logger.exception("Failed to return collaboration debug data", exc_info=True)
         return admin_fail(
@@ -581,27 +707,35 @@ async def run_collaboration_audit(
         window_start = window_end - timedelta(days=days)
         user_map = {}
         if users:
-            user_rows = db.query(User).filter(User.email.in_(users)).all()
+            user_rows = db.query(User).filter(_email_in(db, users)).all()
             user_map = {u.id: u for u in user_rows}
             target_user_ids = set(user_map.keys())
         else:
             target_user_ids = None
 
-        msg_query = db.query(Message).filter(Message.created_at >= window_start)
+        # Only the three columns the grouping needs, streamed in chunks through a
+        # server-side cursor instead of materializing up to 5000 Message objects
+        msg_query = db.query(Message.id, Message.user_id, Message.chat_instance_id).filter(
+            Message.created_at >= window_start
+        )
         if target_user_ids:
             msg_query = msg_query.filter(Message.user_id.in_(target_user_ids))
-        messages = msg_query.order_by(Message.chat_instance_id, Message.created_at).limit(5000).all()
+        msg_rows = (
+            msg_query.order_by(Message.chat_instance_id, Message.created_at)
+            .limit(5000)
+            .yield_per(1000)
+        )
 
         chat_groups: dict[str, dict] = {}
-        for m in messages:
+        for message_id, user_id, chat_id in msg_rows:
             grp = chat_groups.setdefault(
-                m.chat_instance_id,
-                {"message_ids": [], "user_ids": set(), "chat_id": m.chat_instance_id},
+                chat_id,
+                {"message_ids": [], "user_ids": set(), "chat_id": chat_id},
             )
-            if m.id:
-                grp["message_ids"].append(m.id)
-            if m.user_id:
-                grp["user_ids"].add(m.user_id)
+            if message_id:
+                grp["message_ids"].append(message_id)
+            if user_id:
+                grp["user_ids"].add(user_id)
 
         # Fetch user records for all involved users to map emails
         all_user_ids = set().union(*[g["user_ids"] for g in chat_groups.values()]) if chat_groups else set()
@@ -626,23 +760,46 @@ async def run_collaboration_audit(
                 if n.signal_hash:
                     notifications_by_hash.setdefault(n.signal_hash, []).append(n)
 
-        existing_signals = {
-            row.computed_hash: row
-            for row in db.query(CollaborationSignal).filter(CollaborationSignal.created_at >= window_start).all()
-        }
-
-        computed = []
-        mismatches = []
-        saved_count = 0
-
+        # Hash every chat first so the signals already stored for them can be
+        # fetched by hash, as (hash, sent) pairs rather than whole rows
+        # The digest input is built as bytes from parts encoded once (user ids repeat
+        # across chats); it is byte-for-byte "chat_activity|chat|users|messages|day".
+        user_id_bytes = {uid: str(uid).encode("utf-8") for uid in all_user_ids}
+        window_day = window_start.date().isoformat().encode("utf-8")
+        candidates = []
         for chat_id, info in chat_groups.items():
             user_ids_list = sorted(list(info["user_ids"]))
             message_ids_list = sorted(info["message_ids"])
             if not message_ids_list or not user_ids_list:
                 continue
+            hash_basis = b"|".join((
+                b"chat_activity",
+                str(chat_id).encode("utf-8"),
+                b",".join([user_id_bytes[uid] for uid in user_ids_list]),
+                ",".join(message_ids_list).encode("utf-8"),
+                window_day,
+            ))
+            # Content fingerprint, not a security boundary: 128-bit BLAKE2b is cheaper than SHA-1
+            computed_hash = hashlib.blake2b(hash_basis, digest_size=16).hexdigest()
+            candidates.append((chat_id, user_ids_list, message_ids_list, computed_hash))
+
+        existing_sent = {}
+        if candidates:
+            existing_sent = dict(
+                db.query(CollaborationSignal.computed_hash, CollaborationSignal.sent)
+                .filter(
+                    CollaborationSignal.created_at >= window_start,
+                    CollaborationSignal.computed_hash.in_([c[3] for c in candidates]),
+                )
+                .all()
+            )
+
+        computed = []
+        mismatches = []
+        saved_count = 0
+
+        for chat_id, user_ids_list, message_ids_list, computed_hash in candidates:
             involved_emails = [user_map[uid].email for uid in user_ids_list if uid in user_map]
-            hash_basis = f"chat_activity|{chat_id}|{','.join(user_ids_list)}|{','.join(message_ids_list)}|{window_start.date().isoformat()}"
-            computed_hash = hashlib.sha1(hash_basis.encode("utf-8")).hexdigest()
             score = len(message_ids_list)
 
             matched_notification_id = None
@@ -650,8 +807,7 @@ async def run_collaboration_audit(
             if notifications_for_hash:
                 matched_notification_id = notifications_for_hash[0].id
 
-            existing = existing_signals.get(computed_hash)
-            sent_flag = matched_notification_id is not None or (existing.sent if existing else False)
+            sent_flag = matched_notification_id is not None or existing_sent.get(computed_hash, False)
             expected_send = True  # any chat activity should produce a signal
 
             if expected_send and not sent_flag:
@@ -689,27 +845,28 @@ async def run_collaboration_audit(
             computed.append(signal_payload)
 
         if persist and computed:
-            existing_hashes = set(existing_signals.keys())
-            for c in computed:
-                if c["computed_hash"] in existing_hashes:
-                    continue
-                db.add(
-                    CollaborationSignal(
-                        id=c["id"],
-                        signal_type=c["signal_type"],
-                        user_ids=c["user_ids"],
-                        chat_id=c["chat_id"],
-                        message_ids=c["message_ids"],
-                        computed_hash=c["computed_hash"],
-                        notification_id=c["notification_id"],
-                        sent=c["sent"],
-                        window_start=datetime.fromisoformat(c["window_start"]),
-                        window_end=datetime.fromisoformat(c["window_end"]),
-                        score=c["score"],
-                        details=c["details"],
-                    )
+            new_signals = [
+                CollaborationSignal(
+                    id=c["id"],
+                    signal_type=c["signal_type"],
+                    user_ids=c["user_ids"],
+                    chat_id=c["chat_id"],
+                    message_ids=c["message_ids"],
+                    computed_hash=c["computed_hash"],
+                    notification_id=c["notification_id"],
+                    sent=c["sent"],
+                    window_start=datetime.fromisoformat(c["window_start"]),
+                    window_end=datetime.fromisoformat(c["window_end"]),
+                    score=c["score"],
+                    details=c["details"],
                 )
-                saved_count += 1
+                for c in computed
+                if c["computed_hash"] not in existing_sent
+            ]
+            # Bulk INSERTs skip the unit of work's per-object bookkeeping
+            for start in range(0, len(new_signals), SIGNAL_INSERT_BATCH_SIZE):
+                db.bulk_save_objects(new_signals[start:start + SIGNAL_INSERT_BATCH_SIZE])
+            saved_count = len(new_signals)
             db.add(
                 CollaborationAuditRun(
                     id=request_id,
@@ -773,10 +930,11 @@ async def collaboration_graph(
 ):
     request_id = str(uuid.uuid4())
     try:
-        window_start = datetime.utcnow() - timedelta(days=days)
+        window_end = datetime.utcnow()
+        window_start = window_end - timedelta(days=days)
         user_map = {}
         if users:
-            user_rows = db.query(User).filter(User.email.in_(users)).all()
+            user_rows = db.query(User).filter(_email_in(db, users)).all()
             user_map = {u.id: u for u in user_rows}
             target_user_ids = set(user_map.keys())
         else:
@@ -883,7 +1041,7 @@ async def collaboration_graph(
 
         data = {
             "users": [{"id": uid, "email": user_map[uid].email} for uid in user_map],
-            "date_range": {"start": window_start.isoformat(), "end": datetime.utcnow().isoformat()},
+            "date_range": {"start": window_start.isoformat(), "end": window_end.isoformat()},
             "nodes": nodes,
             "edges": edges,
             "threads": threads_out,
@@ -13,10 +13,8 @@ import re
 import logging
 
 from app.api.dependencies import require_platform_admin
-from app.services.canon import _cache_key
 from app.services import log_buffer
 from app.services.event_emitter import emit_event
-from app.services.event_emitter import emit_event
 from app.api.admin.utils import admin_ok, admin_fail, sanitize_for_json
 
 logger = logging.getLogger(__name__)
@@ -129,7 +127,7 @@ def parse_timeline_logs(user_email: str) -> dict:
     First checks in-memory cache, then falls back to log parsing.
     """
     # Check in-memory cache first
-    from app.services.canon import TIMELINE_DEBUG_CACHE
+    from app.services.canon import TIMELINE_DEBUG_CACHE, _cache_key
     cache_key = _cache_key(user_email)
 
     if cache_key in TIMELINE_DEBUG_CACHE:
@@ -710,6 +708,8 @@ async def get_timeline_stage_detail(
     page: int = Query(default=1, ge=1, le=1000),
     current_user: User = Depends(require_platform_admin),
 ):
+    from app.services.canon import _cache_key
+
     request_id = str(uuid.uuid4())
     try:
         data = parse_timeline_logs(user_email)
@@ -829,6 +829,8 @@ async def timeline_probe(
     """
     Probe timeline snapshot consistency. Optionally trigger a refresh first.
     """
+    from app.services.canon import _cache_key
+
     request_id = str(uuid.uuid4())
     try:
         user = db.query(User).filter(User.email == user_email).first()
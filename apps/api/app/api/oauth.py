@@ -136,8 +136,13 @@ def _rate_limit(key: str, max_calls: int, window_seconds: int, request: Request)
 
 
 def _hash_token(token: str) -> str:
-    """Hash a token for secure storage."""
-    return hashlib.sha256(f"{SECRET_KEY}:{token}".encode()).hexdigest()
+    """Hex form of _token_digest."""
+    return _token_digest(token).hex()
+
+def _token_digest(token: str) -> bytes:
+    """SHA-256 of a token keyed with SECRET_KEY (not a bare hash of the token), as
+    bytes; this is what the bytea ``token_hash`` columns store."""
+    return hashlib.sha256(f"{SECRET_KEY}:{token}".encode()).digest()
 
 def _cache_auth_code(auth_code: OAuthAuthorizationCode) -> None:
     AUTH_CODE_CACHE[auth_code.id] = CachedAuthCode(
@@ -749,7 +754,7 @@ async def _handle_refresh_token_grant(
         return _token_error("invalid_request", "Missing refresh_token")
     
     # Find refresh token
-    token_hash = _hash_token(refresh_token_value)
+    token_hash = _token_digest(refresh_token_value)
     refresh_token = db.query(OAuthRefreshToken).filter(
         OAuthRefreshToken.token_hash == token_hash
     ).first()
@@ -817,7 +822,7 @@ def _issue_tokens(
     
     new_refresh = OAuthRefreshToken(
         id=str(uuid.uuid4()),
-        token_hash=_hash_token(new_refresh_value),
+        token_hash=_token_digest(new_refresh_value),
         client_id=client.id,
         user_id=user_id,
         scope=scope,
@@ -828,7 +833,7 @@ def _issue_tokens(
     # Record access token
     access_record = OAuthAccessToken(
         id=jti,
-        token_hash=_hash_token(access_token)[:64],
+        token_hash=_token_digest(access_token),
         client_id=client.id,
         user_id=user_id,
         refresh_token_id=new_refresh.id,
@@ -903,7 +908,7 @@ async def revoke_endpoint(
         # Per RFC 7009, invalid client should still return 200
         return JSONResponse(content={}, status_code=200)
     
-    token_hash = _hash_token(token)
+    token_hash = _token_digest(token)
     
     # Try to find as refresh token first
     refresh = db.query(OAuthRefreshToken).filter(
@@ -917,7 +922,7 @@ async def revoke_endpoint(
     
     # Also check if it's an access token (by jti in hash)
     access = db.query(OAuthAccessToken).filter(
-        OAuthAccessToken.token_hash == token_hash[:64],
+        OAuthAccessToken.token_hash == token_hash,
         OAuthAccessToken.client_id == client_id,
     ).first()
     
@@ -13,7 +13,14 @@ from config import config
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.api.v1.deps import get_current_user, get_db, hash_pat_secret, rate_limit_dep, require_scope
+from app.api.v1.deps import (
+    digest_pat_secret,
+    get_current_user,
+    get_db,
+    hash_pat_secret,
+    rate_limit_dep,
+    require_scope,
+)
 from models import PersonalAccessToken, RoomMember, User, VSCodeAuthCode
 
 router = APIRouter()
@@ -232,7 +239,7 @@ def vscode_auth_start(
     expires_at = now + timedelta(seconds=VSCODE_AUTH_CODE_TTL_SECONDS)
 
     auth_code = VSCodeAuthCode(
-        code_hash=hash_pat_secret(code),
+        code_hash=digest_pat_secret(code),
         user_id=current_user.id,
         created_at=now,
         expires_at=expires_at,
@@ -254,7 +261,7 @@ def vscode_auth_exchange(
     if not code:
         raise HTTPException(status_code=400, detail="auth_code is required")
 
-    code_hash = hash_pat_secret(code)
+    code_hash = digest_pat_secret(code)
     record = (
         db.query(VSCodeAuthCode)
         .filter(VSCodeAuthCode.code_hash == code_hash)
@@ -49,8 +49,9 @@ def list_users_alias(
         logger.info("[USERS] No org_id on current user; returning empty list")
         return []
 
+    # Only the serialized columns are loaded, which ix_users_org_id covers
     users = (
-        db.query(UserORM)
+        db.query(UserORM.id, UserORM.email, UserORM.name, UserORM.org_id)
         .filter(UserORM.org_id == current_user.org_id)
         .all()
     )
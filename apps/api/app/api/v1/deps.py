@@ -35,7 +35,14 @@ def get_db():
 
 
 def hash_pat_secret(secret: str) -> str:
-    return hashlib.sha256(f"{PAT_PEPPER}:{secret}".encode("utf-8")).hexdigest()
+    """Hex form of digest_pat_secret, as stored in personal_access_tokens.token_hash."""
+    return digest_pat_secret(secret).hex()
+
+
+def digest_pat_secret(secret: str) -> bytes:
+    """SHA-256 of a secret keyed with PAT_PEPPER, as bytes, for bytea columns such as
+    vscode_auth_codes.code_hash."""
+    return hashlib.sha256(f"{PAT_PEPPER}:{secret}".encode("utf-8")).digest()
 
 
 def _verify_pat(db: Session, token: str) -> Optional[PersonalAccessToken]:
@@ -64,6 +64,16 @@ def _require_same_org(db: Session, sender: User, target_user_id: str) -> Optiona
     return target
 
 
+def _get_task(db: Session, task_id: str) -> Optional[AgentInbox]:
+    # agent_inbox.id is a native uuid column; a malformed id can't match any row and
+    # would otherwise fail the cast inside Postgres
+    try:
+        uuid.UUID(task_id)
+    except ValueError:
+        return None
+    return db.query(AgentInbox).filter(AgentInbox.id == task_id).first()
+
+
 def _active_clients_for_user(
     db: Session,
     user_id: str,
@@ -246,7 +256,7 @@ def ack_inbox_task(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    task = db.query(AgentInbox).filter(AgentInbox.id == task_id).first()
+    task = _get_task(db, task_id)
     if not task:
         return _error_response(request, 404, "NOT_FOUND", "Task not found.")
     if task.to_user_id != current_user.id:
@@ -396,7 +406,7 @@ def get_task_status(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    task = db.query(AgentInbox).filter(AgentInbox.id == task_id).first()
+    task = _get_task(db, task_id)
     if not task:
         return _error_response(request, 404, "NOT_FOUND", "Task not found.")
     if task.to_user_id not in {current_user.id} and task.from_user_id not in {current_user.id}:
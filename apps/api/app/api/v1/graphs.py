@@ -40,6 +40,12 @@ def _ensure_owner(agent: GraphAgent, current_user: User) -> None:
 
 
 def _load_agent(db: Session, agent_id: str, current_user: User) -> GraphAgent:
+    # graph_agents.id is a native uuid column on Postgres, where a malformed id would
+    # fail the cast instead of simply not matching
+    try:
+        uuid.UUID(agent_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Agent not found")
     agent = db.query(GraphAgent).filter(GraphAgent.id == agent_id).first()
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
@@ -5,10 +5,16 @@ import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects import postgresql
 
 from models import Base, json_field_type
 
 
+# Native uuid in Postgres, matching 20260306_add_graph_system (strings on the Python
+# side); SQLite, which has no uuid type, keeps text. Ids are generated by _uuid().
+_ID = postgresql.UUID(as_uuid=False).with_variant(String, "sqlite")
+
+
 def _uuid() -> str:
     return str(uuid.uuid4())
 
@@ -16,7 +22,7 @@ def _uuid() -> str:
 class GraphAgent(Base):
     __tablename__ = "graph_agents"
 
-    id = Column(String, primary_key=True, default=_uuid)
+    id = Column(_ID, primary_key=True, default=_uuid)
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     pipeline_config = Column(json_field_type, nullable=False, default=dict)
@@ -28,8 +34,8 @@ class GraphAgent(Base):
 class GraphExecution(Base):
     __tablename__ = "graph_executions"
 
-    id = Column(String, primary_key=True, default=_uuid)
-    agent_id = Column(String, ForeignKey("graph_agents.id"), nullable=False, index=True)
+    id = Column(_ID, primary_key=True, default=_uuid)
+    agent_id = Column(_ID, ForeignKey("graph_agents.id"), nullable=False, index=True)
     status = Column(String, nullable=False, index=True, default="pending")  # pending/running/completed/failed
     input_data = Column(json_field_type, nullable=True)
     output_data = Column(json_field_type, nullable=True)
@@ -41,8 +47,8 @@ class GraphExecution(Base):
 class GraphHistory(Base):
     __tablename__ = "graph_history"
 
-    id = Column(String, primary_key=True, default=_uuid)
-    agent_id = Column(String, ForeignKey("graph_agents.id"), nullable=False, index=True)
+    id = Column(_ID, primary_key=True, default=_uuid)
+    agent_id = Column(_ID, ForeignKey("graph_agents.id"), nullable=False, index=True)
     version = Column(Integer, nullable=False)
     pipeline_config = Column(json_field_type, nullable=False, default=dict)
     change_summary = Column(Text, nullable=True)
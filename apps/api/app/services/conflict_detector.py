@@ -13,6 +13,26 @@ from models import UserAction, User as UserORM, RoomMember
 
 logger = logging.getLogger(__name__)
 
+# activity_embedding is vector(1536) on installs that haven't run
+# 20260402_convert_activity_embeddings_to_halfvec yet and halfvec(1536) after, and the
+# query embedding must be cast to the same type for the index to apply. Looked up once
+# per process; migrations run before the workers restart.
+_ACTIVITY_EMBEDDING_TYPES = {"vector", "halfvec"}
+_cached_embedding_type: Optional[str] = None
+
+
+def _activity_embedding_type(db: Session) -> str:
+    """pgvector type of user_actions.activity_embedding ('vector' or 'halfvec')."""
+    global _cached_embedding_type
+    if _cached_embedding_type is None:
+        type_name = db.execute(text("""
+            SELECT t.typname
+            FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid
+            WHERE a.attrelid = CAST('user_actions' AS regclass) AND a.attname = 'activity_embedding'
+        """)).scalar()
+        _cached_embedding_type = type_name if type_name in _ACTIVITY_EMBEDDING_TYPES else "vector"
+    return _cached_embedding_type
+
 
 def get_shared_rooms(user_a_id: str, user_b_id: str, db: Session) -> List[str]:
     """Return room IDs that both users share."""
@@ -163,35 +183,44 @@ def find_conflicts(
 
         # Use pgvector for fast similarity search
         # Only check activities from different users in same room (if room exists)
+        # Deliberately an exact scan: ordering by the derived similarity keeps the planner
+        # off idx_user_actions_embedding. An HNSW scan only returns its ef_search nearest
+        # rows before the user/cutoff/threshold filters run, so recent conflicts from
+        # other users can be dropped when the neighbourhood is full of old or own
+        # activity. The cutoff keeps the scan to the window's rows (ix_user_actions_timestamp).
         try:
             # Build SQL query with pgvector similarity
             embedding_str = "[" + ",".join(map(str, activity.activity_embedding)) + "]"
 
-            sql = text("""
-                SELECT
-                    id,
-                    user_id,
-                    activity_summary,
-                    timestamp,
-                    1 - (activity_embedding <=> CAST(:query_embedding AS vector)) as similarity
-                FROM user_actions
-                WHERE
-                    user_id != :user_id
-                    AND activity_embedding IS NOT NULL
-                    AND timestamp >= :cutoff
-                    AND 1 - (activity_embedding <=> CAST(:query_embedding AS vector)) > :threshold
-                ORDER BY similarity DESC
-                LIMIT 10
-            """)
-
-            result = db.execute(sql, {
-                "query_embedding": embedding_str,
-                "user_id": activity.user_id,
-                "cutoff": cutoff,
-                "threshold": semantic_similarity_threshold
-            })
+            # Inside a savepoint: a failed search (e.g. pgvector missing) rolls back just
+            # this query instead of leaving the caller's transaction aborted
+            with db.begin_nested():
+                embedding_type = _activity_embedding_type(db)
+                sql = text(f"""
+                    SELECT
+                        id,
+                        user_id,
+                        activity_summary,
+                        timestamp,
+                        1 - (activity_embedding <=> CAST(:query_embedding AS {embedding_type})) as similarity
+                    FROM user_actions
+                    WHERE
+                        user_id != :user_id
+                        AND activity_embedding IS NOT NULL
+                        AND timestamp >= :cutoff
+                        AND 1 - (activity_embedding <=> CAST(:query_embedding AS {embedding_type})) > :threshold
+                    ORDER BY similarity DESC
+                    LIMIT 10
+                """)
+
+                result = db.execute(sql, {
+                    "query_embedding": embedding_str,
+                    "user_id": activity.user_id,
+                    "cutoff": cutoff,
+                    "threshold": semantic_similarity_threshold
+                })
 
-            rows = result.fetchall()
+                rows = result.fetchall()
 
             for row in rows:
                 other_user_id = row[1]
@@ -87,7 +87,7 @@ def get_relevant_context(
         f"""
         SELECT 
             id,
-            1 - (embedding <=> CAST(:query_embedding AS vector)) as similarity,
+            1 - (embedding <=> CAST(:query_embedding AS halfvec)) as similarity,
             visible_room_ids
         FROM messages
         WHERE 
@@ -98,7 +98,7 @@ def get_relevant_context(
                 ((visible_room_ids IS NULL OR cardinality(visible_room_ids)=0) AND room_id = ANY(:viewer_room_ids))
             )
             {room_restriction}
-            AND 1 - (embedding <=> CAST(:query_embedding AS vector)) > :threshold
+            AND 1 - (embedding <=> CAST(:query_embedding AS halfvec)) > :threshold
             {time_filter}
         ORDER BY similarity DESC
         LIMIT :limit
@@ -0,0 +1,89 @@
+import logging
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from database import engine
+from migration_helpers import create_next_month_partition
+
+# Use root logger to ensure logs propagate to main FastAPI logger
+logger = logging.getLogger("partition_worker")
+logger.setLevel(logging.INFO)
+logger.propagate = True  # Let logs flow to root logger
+
+# Add dedicated handler with clear prefix
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("🗂️ [Partition Worker] [%(asctime)s] %(message)s"))
+logger.addHandler(handler)
+
+# Tables range-partitioned by month on created_at. Their revisions only create the
+# first 12 months plus a DEFAULT partition; once rows for a month land in DEFAULT,
+# that month's partition can no longer be created, so it has to exist beforehand.
+PARTITIONED_TABLES = ("code_events", "app_events")
+# Daily is plenty: the next month's partition only has to exist before the 1st
+PARTITION_WORKER_CHECK_INTERVAL_HOURS = 24
+
+
+def ensure_next_month_partitions():
+    """Create next month's partition of every table in PARTITIONED_TABLES (no-op if present)."""
+    if engine.dialect.name != "postgresql":
+        return
+    for table in PARTITIONED_TABLES:
+        try:
+            # One transaction per table so a failure on one doesn't skip the rest
+            with engine.begin() as conn:
+                relkind = conn.execute(
+                    text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+                ).scalar()
+                # 'p' = partitioned table; anything else has no partitions to add
+                if relkind != "p":
+                    logger.info(f"⏭️  {table} is not partitioned, skipping")
+                    continue
+                create_next_month_partition(conn, table)
+        except Exception as e:
+            logger.error(f"❌ Could not create next month's partition of {table}: {e}", exc_info=True)
+    logger.info(f"✅ Next month's partitions checked for: {', '.join(PARTITIONED_TABLES)}")
+
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+
+scheduler = AsyncIOScheduler()
+
+# Flag to prevent duplicate workers in multi-process environments
+_worker_started = False
+
+
+def start_partition_worker():
+    """
+    Start the background partition maintenance worker (call at app startup, next to
+    start_canon_worker/start_notification_worker).
+    IMPORTANT: Only starts in the FIRST process (prevents duplicates in multi-worker setups).
+    """
+    global _worker_started
+
+    # Prevent duplicate workers in multi-process environments
+    if _worker_started:
+        logger.warning("⚠️  Worker already started in this process, skipping duplicate")
+        return
+
+    # Check if scheduler is already running (in case of app reload)
+    if scheduler.running:
+        logger.warning("⚠️  Scheduler already running, skipping duplicate")
+        return
+
+    # A sync job runs in the scheduler's thread pool, off the event loop. The first
+    # run is immediate so a deploy late in the month is covered before the 1st.
+    scheduler.add_job(
+        ensure_next_month_partitions,
+        "interval",
+        hours=PARTITION_WORKER_CHECK_INTERVAL_HOURS,
+        id="partition_maintenance_worker",
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    scheduler.start()
+    _worker_started = True
+
+    logger.info(f"🚀 STARTED (interval: {PARTITION_WORKER_CHECK_INTERVAL_HOURS} hour(s), process {os.getpid()})")
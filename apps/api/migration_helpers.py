@@ -0,0 +1,212 @@
+"""
+Shared helpers for alembic revisions (reflection, index builds, partitions and
+batched backfills).
+
+Revisions create one Inspector per upgrade()/downgrade() call and pass it to these
+helpers. SQLAlchemy memoizes reflection results on the Inspector instance, so
+repeated checks against the same table cost a single catalog query.
+
+Inspectors are intentionally not cached across revisions: every revision in a run
+shares one connection, and a longer-lived cache would keep returning the columns
+that existed before earlier DDL ran.
+"""
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, Optional, Sequence, Set
+
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Memory budget for a revision's index builds, from the same variable 20250312 reads.
+# When create_indexes_in_parallel() overlaps several builds it is split between them,
+# so the server never sees more than this at once from one migration.
+INDEX_MAINTENANCE_WORK_MEM = os.getenv("VECTOR_INDEX_MAINTENANCE_WORK_MEM", "1GB")
+
+_MEMORY_UNITS_KB = {"kb": 1, "mb": 1024, "gb": 1024 ** 2, "tb": 1024 ** 3}
+
+
+def column_names(insp: Inspector, table_name: str) -> Set[str]:
+    """Column names of ``table_name``, or an empty set if the table doesn't exist."""
+    if not insp.has_table(table_name):
+        return set()
+    return {col["name"] for col in insp.get_columns(table_name)}
+
+
+def has_column(insp: Inspector, table_name: str, column_name: str) -> bool:
+    return column_name in column_names(insp, table_name)
+
+
+def schema_snapshot(insp: Inspector) -> Dict[str, Set[str]]:
+    """Column names of every table in the default schema, keyed by table name.
+
+    Reflected through ``get_multi_columns()``, which on Postgres is a single batched
+    catalog query instead of one round-trip per table. Take the snapshot before any
+    DDL in the revision; it does not see tables or columns added afterwards.
+    """
+    return {table: {col["name"] for col in cols} for (_, table), cols in insp.get_multi_columns().items()}
+
+
+def estimated_row_count(bind, table_name: str) -> int:
+    """Planner estimate of a table's row count (0 if never analyzed or not on Postgres)."""
+    if bind.dialect.name != "postgresql":
+        return 0
+    reltuples = bind.execute(
+        sa.text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    ).scalar()
+    return max(int(reltuples or 0), 0)
+
+
+# ivfflat trains its centroids on the rows present at build time; below this many
+# rows the lists are mostly empty and recall stays poor until a REINDEX.
+IVFFLAT_MIN_TRAINING_ROWS = 1000
+
+
+def ivfflat_lists(row_count: int) -> int:
+    """pgvector's sizing guidance for ivfflat ``lists``: rows/1000 up to 1M rows, sqrt(rows) beyond."""
+    if row_count >= 1_000_000:
+        return int(math.sqrt(row_count))
+    return max(30, row_count // 1000)
+
+
+def _memory_kb(value: str) -> int:
+    """A Postgres memory setting such as ``'512MB'`` in kB (bare numbers are already kB)."""
+    value = value.strip().lower()
+    for unit, factor in _MEMORY_UNITS_KB.items():
+        if value.endswith(unit):
+            return int(float(value[: -len(unit)]) * factor)
+    return int(value)
+
+
+def create_indexes_in_parallel(
+    bind,
+    indexes: Sequence[sa.Index],
+    settings: Optional[Dict[str, str]] = None,
+    max_workers: Optional[int] = None,
+) -> None:
+    """Build ``indexes`` on separate autocommit connections so their builds overlap.
+
+    Plain CREATE INDEX takes a SHARE lock, which doesn't conflict with itself, so
+    several builds on the same table can run at once (CONCURRENTLY builds would
+    queue behind each other). Call this from inside ``autocommit_block()`` so the
+    migration transaction no longer holds locks on the target tables. ``settings``
+    are applied to every build connection, except ``maintenance_work_mem``, which is
+    the budget for the whole call and is divided between the concurrent builds;
+    workers default to half of ``max_parallel_maintenance_workers``.
+
+    Outside Postgres the indexes are simply created one by one on ``bind``.
+    """
+    if bind.dialect.name != "postgresql":
+        for index in indexes:
+            bind.execute(CreateIndex(index, if_not_exists=True))
+        return
+
+    settings = settings or {}
+    if max_workers is None:
+        maintenance_workers = settings.get("max_parallel_maintenance_workers") or bind.execute(
+            sa.text("SHOW max_parallel_maintenance_workers")
+        ).scalar()
+        max_workers = max(1, int(maintenance_workers) // 2)
+
+    workers = min(max_workers, len(indexes)) or 1
+    if "maintenance_work_mem" in settings:
+        # 1MB is the smallest value Postgres accepts
+        share = max(_memory_kb(settings["maintenance_work_mem"]) // workers, 1024)
+        settings = {**settings, "maintenance_work_mem": f"{share}kB"}
+
+    engine = sa.create_engine(bind.engine.url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+
+    def _build(index: sa.Index) -> None:
+        with engine.connect() as conn:
+            for name, value in settings.items():
+                conn.execute(sa.text("SELECT set_config(:name, :value, false)"), {"name": name, "value": value})
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # list() re-raises the first failed build
+            list(pool.map(_build, indexes))
+    finally:
+        engine.dispose()
+
+
+def _next_month(month_start: date) -> date:
+    if month_start.month == 12:
+        return date(month_start.year + 1, 1, 1)
+    return date(month_start.year, month_start.month + 1, 1)
+
+
+def create_month_partition(bind, table_name: str, month: date) -> None:
+    """Create ``<table>_YYYYMM`` for the month containing ``month`` (no-op if it exists)."""
+    start = date(month.year, month.month, 1)
+    bind.execute(
+        sa.text(
+            f"CREATE TABLE IF NOT EXISTS {table_name}_{start:%Y%m} PARTITION OF {table_name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_next_month(start).isoformat()}')"
+        )
+    )
+
+
+def create_month_partitions(bind, table_name: str, months: int = 12, today: Optional[date] = None) -> None:
+    """Partitions for the current month and the ``months - 1`` after it, plus a DEFAULT
+    partition so inserts past the last month never fail."""
+    month = (today or date.today()).replace(day=1)
+    for _ in range(months):
+        create_month_partition(bind, table_name, month)
+        month = _next_month(month)
+    bind.execute(sa.text(f"CREATE TABLE IF NOT EXISTS {table_name}_default PARTITION OF {table_name} DEFAULT"))
+
+
+def create_next_month_partition(bind, table_name: str, today: Optional[date] = None) -> None:
+    """Meant for a daily job: make sure next month's partition exists before its rows
+    arrive (once rows for a month land in the DEFAULT partition, the month's own
+    partition can no longer be attached)."""
+    create_month_partition(bind, table_name, _next_month((today or date.today()).replace(day=1)))
+
+
+def run_in_keyset_batches(bind, table_name: str, key: str, statement: str, batch_size: int = 10000) -> int:
+    """Run ``statement`` once per ``batch_size``-row slice of ``table_name`` in ``key`` order.
+
+    ``statement`` contains a ``{batch}`` placeholder that is replaced by the key-range
+    predicate of the current slice (written against ``table_name.key``, so the table
+    must not be aliased). Each slice is located through the key's index, so batches
+    stay cheap however far into the table they are. Call from inside
+    ``autocommit_block()`` so every slice commits on its own. Returns the total rowcount.
+    """
+    column = f"{table_name}.{key}"
+    after = None
+    total = 0
+    while True:
+        started = time.monotonic()
+        params = {"skip": batch_size - 1}
+        conditions = []
+        if after is not None:
+            conditions.append(f"{column} > :after")
+            params["after"] = after
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        upto = bind.execute(
+            sa.text(f"SELECT {column} FROM {table_name} {where} ORDER BY {column} OFFSET :skip LIMIT 1"),
+            params,
+        ).scalar()
+        if upto is not None:
+            conditions.append(f"{column} <= :upto")
+            params["upto"] = upto
+
+        rowcount = bind.execute(
+            sa.text(statement.format(batch=" AND ".join(conditions) or "TRUE")),
+            {name: value for name, value in params.items() if name != "skip"},
+        ).rowcount
+        total += rowcount
+        logger.info("%s: batch of %d rows in %.2fs (%d total)", table_name, rowcount, time.monotonic() - started, total)
+
+        if upto is None:
+            return total
+        after = upto
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.admin import collaboration
+
+
+USERS = [
+    SimpleNamespace(id="user-1", email="one@example.com", name="User One"),
+    SimpleNamespace(id="user-2", email="two@example.com", name="User Two"),
+]
+
+
+class _FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class _FakeDB:
+    """Just enough of a Session for the user lookup in /collaboration-debug."""
+
+    def __init__(self):
+        self.user_queries = 0
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
+    def query(self, *columns):
+        self.user_queries += 1
+        return _FakeQuery(USERS)
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(collaboration, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    collaboration._collab_debug_cache.clear()
+    yield
+    collaboration._collab_debug_cache.clear()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = _FakeDB()
+
+    async def no_rows(bind, fetch, *args):
+        return []
+
+    monkeypatch.setattr(collaboration, "_read_in_own_session", no_rows)
+    return db
+
+
+def get_client(db):
+    app = FastAPI()
+    app.include_router(collaboration.router, prefix="/api/admin")
+    app.dependency_overrides[collaboration.get_db] = lambda: db
+    app.dependency_overrides[collaboration.require_platform_admin] = lambda: SimpleNamespace(
+        email="admin@example.com"
+    )
+    return TestClient(app)
+
+
+def test_cached_entry_expires_after_ttl(clock):
+    collaboration._store_collab_debug("key", {"value": 1}, {"input": {}})
+
+    clock[0] += collaboration.COLLAB_DEBUG_CACHE_TTL_SECONDS - 1
+    assert collaboration._get_cached_collab_debug("key")[1] == {"value": 1}
+
+    clock[0] += 1
+    assert collaboration._get_cached_collab_debug("key") is None
+    assert "key" not in collaboration._collab_debug_cache
+
+
+def test_oldest_entry_is_evicted_at_capacity(clock):
+    limit = collaboration.COLLAB_DEBUG_CACHE_MAX_ENTRIES
+    for i in range(limit):
+        collaboration._store_collab_debug(i, {"value": i}, {"input": {}})
+    # Re-storing a key moves it to the back of the eviction order
+    collaboration._store_collab_debug(0, {"value": 0}, {"input": {}})
+
+    collaboration._store_collab_debug(limit, {"value": limit}, {"input": {}})
+
+    assert len(collaboration._collab_debug_cache) == limit
+    assert collaboration._get_cached_collab_debug(1) is None
+    assert collaboration._get_cached_collab_debug(0) is not None
+    assert collaboration._get_cached_collab_debug(limit) is not None
+
+
+def test_repeat_request_is_served_from_cache(clock, fake_db):
+    client = get_client(fake_db)
+    params = [("users", "one@example.com"), ("users", "two@example.com"), ("days", "7")]
+
+    first = client.get("/api/admin/collaboration-debug", params=params)
+    assert first.status_code == 200, first.text
+    assert first.json()["debug"]["cache"] == {"hit": False}
+    assert "chat_instances" not in first.json()["debug"]["db"]["tables_queried"]
+
+    clock[0] += 30
+    # Same users in a different order share the cache entry
+    second = client.get("/api/admin/collaboration-debug", params=list(reversed(params[:2])) + params[2:])
+    assert second.status_code == 200, second.text
+    assert second.json()["debug"]["cache"] == {"hit": True, "age_seconds": 30.0}
+    assert second.json()["data"] == first.json()["data"]
+    assert fake_db.user_queries == 1
+
+
+def test_different_window_is_a_cache_miss(clock, fake_db):
+    client = get_client(fake_db)
+    users = [("users", "one@example.com"), ("users", "two@example.com")]
+
+    client.get("/api/admin/collaboration-debug", params=users + [("days", "7")])
+    resp = client.get("/api/admin/collaboration-debug", params=users + [("days", "14")])
+
+    assert resp.json()["debug"]["cache"] == {"hit": False}
+    assert fake_db.user_queries == 2
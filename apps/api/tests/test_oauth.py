@@ -414,13 +414,13 @@ class TestRefreshToken:
     
     def test_refresh_token_rotation(self, client, db, oauth_client, test_user):
         """Refresh should return new tokens and rotate refresh token."""
-        from app.api.oauth import _hash_token
+        from app.api.oauth import _token_digest
         
         # Create initial refresh token
         refresh_value = secrets.token_urlsafe(32)
         refresh_token = OAuthRefreshToken(
             id=str(uuid.uuid4()),
-            token_hash=_hash_token(refresh_value),
+            token_hash=_token_digest(refresh_value),
             client_id=oauth_client.id,
             user_id=test_user.id,
             scope="openid profile",
@@ -452,13 +452,13 @@ class TestRefreshToken:
     
     def test_refresh_token_reuse_detection(self, client, db, oauth_client, test_user):
         """Reusing old refresh token should revoke entire chain."""
-        from app.api.oauth import _hash_token
+        from app.api.oauth import _token_digest
         
         # Create initial refresh token
         refresh_value = secrets.token_urlsafe(32)
         refresh_token = OAuthRefreshToken(
             id=str(uuid.uuid4()),
-            token_hash=_hash_token(refresh_value),
+            token_hash=_token_digest(refresh_value),
             client_id=oauth_client.id,
             user_id=test_user.id,
             scope="openid profile",
@@ -496,13 +496,13 @@ class TestRefreshToken:
     
     def test_scope_narrowing_on_refresh(self, client, db, oauth_client, test_user):
         """Should allow narrowing scope on refresh but not expanding."""
-        from app.api.oauth import _hash_token
+        from app.api.oauth import _token_digest
         
         # Create refresh token with multiple scopes
         refresh_value = secrets.token_urlsafe(32)
         refresh_token = OAuthRefreshToken(
             id=str(uuid.uuid4()),
-            token_hash=_hash_token(refresh_value),
+            token_hash=_token_digest(refresh_value),
             client_id=oauth_client.id,
             user_id=test_user.id,
             scope="openid profile tasks:read tasks:write",
@@ -537,13 +537,13 @@ class TestRevocation:
     
     def test_revoke_refresh_token(self, client, db, oauth_client, test_user):
         """Should revoke refresh token and associated chain."""
-        from app.api.oauth import _hash_token
+        from app.api.oauth import _token_digest
         
         # Create refresh token
         refresh_value = secrets.token_urlsafe(32)
         refresh_token = OAuthRefreshToken(
             id=str(uuid.uuid4()),
-            token_hash=_hash_token(refresh_value),
+            token_hash=_token_digest(refresh_value),
             client_id=oauth_client.id,
             user_id=test_user.id,
             scope="openid profile",
@@ -113,7 +113,7 @@ def auth_header_for(user_id: str) -> dict:
 def _insert_vscode_auth_code(db, user_id: str, code: str, *, expires_at: datetime, used_at: datetime | None = None):
     db.add(
         VSCodeAuthCode(
-            code_hash=deps.hash_pat_secret(code),
+            code_hash=deps.digest_pat_secret(code),
             user_id=user_id,
             created_at=datetime.now(timezone.utc),
             expires_at=expires_at,